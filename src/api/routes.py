@@ -1,11 +1,16 @@
 # src/api/routes.py
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+from typing import Any, Dict, Iterator
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from src.api.schemas import ChatRequest, ChatResponse
-from src.llm.router import answer_query
+from src.llm.router import answer_query, answer_query_stream
 from src.common.logging import setup_logger
 
 router = APIRouter()
@@ -18,27 +23,50 @@ class HealthResponse(BaseModel):
     status: str = "ok"
 
 
-@router.get("/health", response_model=HealthResponse)
-def health_check() -> HealthResponse:
-    return HealthResponse(status="ok")
+# Probes hit these endpoints constantly and the body never changes, so the
+# response is built once and returned as-is (no model validation or JSON
+# encoding per request). HealthResponse still documents the schema.
+_HEALTH_OK = Response(content=b'{"status":"ok"}', media_type="application/json")
+
 
+@router.get(
+    "/health",
+    response_class=Response,
+    responses={200: {"model": HealthResponse}},
+)
+def health_check() -> Response:
+    return _HEALTH_OK
 
-@router.get("/ready", response_model=HealthResponse)
-def readiness_check() -> HealthResponse:
+
+@router.get(
+    "/ready",
+    response_class=Response,
+    responses={200: {"model": HealthResponse}},
+)
+def readiness_check() -> Response:
     # In future you can add checks for KG/index files etc.
-    return HealthResponse(status="ok")
+    return _HEALTH_OK
 
 
 # ---------- Chat endpoint ----------
 
-@router.post("/chat", response_model=ChatResponse)
-def chat_endpoint(payload: ChatRequest) -> ChatResponse:
+def validate_chat_request(payload: ChatRequest) -> ChatRequest:
+    """Reject empty queries before the handler runs."""
     if not payload.user_query.strip():
         raise HTTPException(status_code=400, detail="user_query cannot be empty")
+    return payload
 
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat_endpoint(
+    payload: ChatRequest = Depends(validate_chat_request),
+) -> ChatResponse:
     logger.info("Incoming chat request, member=%s", payload.membership_nbr)
 
-    result = answer_query(
+    # answer_query blocks on retrieval + the LLM call; run it in a worker
+    # thread so the event loop keeps accepting requests meanwhile.
+    result = await asyncio.to_thread(
+        answer_query,
         user_query=payload.user_query,
         membership_nbr=payload.membership_nbr,
     )
@@ -48,3 +76,29 @@ def chat_endpoint(payload: ChatRequest) -> ChatResponse:
         intent=result.get("intent", "unknown"),
         membership_nbr=result.get("used_member_nbr"),
     )
+
+
+def _ndjson_lines(events: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    for event in events:
+        yield json.dumps(event).encode("utf-8") + b"\n"
+
+
+@router.post("/chat/stream")
+def chat_stream_endpoint(
+    payload: ChatRequest = Depends(validate_chat_request),
+) -> StreamingResponse:
+    """
+    Like /chat, but streams the answer as newline-delimited JSON events
+    (see `answer_query_stream`): "meta", then "delta" chunks, then "done".
+    """
+    logger.info("Incoming chat stream request, member=%s", payload.membership_nbr)
+
+    # Starlette iterates a sync generator in its threadpool, so retrieval
+    # and the LLM stream don't block the event loop.
+    events = answer_query_stream(
+        user_query=payload.user_query,
+        membership_nbr=payload.membership_nbr,
+    )
+    return StreamingResponse(
+        _ndjson_lines(events), media_type="application/x-ndjson"
+    )
@@ -2,10 +2,12 @@
 from __future__ import annotations
 
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ChatRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
     user_query: str = Field(..., description="User's natural language question")
     membership_nbr: Optional[int] = Field(
         None,
@@ -8,5 +8,7 @@ MEMBERSHIP_TYPES = ["Savings", "Business"]
 
 SALES_DECILES = list(range(1, 11))
 SALES_CENTILES = list(range(1, 101))
+MAX_SALES_DECILE = SALES_DECILES[-1]
+MAX_SALES_CENTILE = SALES_CENTILES[-1]
 
 ENTITY_TYPES = ["service", "category", "sub_category", "action"]
\ No newline at end of file
@@ -1,8 +1,32 @@
 from __future__ import annotations
+import json
+import shutil
 from pathlib import Path
-from typing import Literal
+from typing import TYPE_CHECKING, Any, Literal
 
-import pandas as pd
+# pandas / pyarrow are imported inside the functions that need them, so
+# importing this module (e.g. from the API app) stays cheap.
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+# Parquet write defaults: zstd pages, dictionary-encoded columns and bounded
+# row groups with statistics + page index, so readers can prune row groups
+# and pages on predicates and decode only the projected columns.
+_PARQUET_WRITE_OPTIONS: dict[str, Any] = {
+    "compression": "zstd",
+    "compression_level": 3,
+    "row_group_size": 128_000,
+    "use_dictionary": True,
+    "write_statistics": True,
+    "write_page_index": True,
+    "data_page_size": 1 << 20,
+}
+
+
+# Schema metadata key listing a dataset's partition columns (JSON)
+_PARTITION_COLS_KEY = b"partition_cols"
 
 
 def ensure_parent_dir(path: str | Path) -> None:
@@ -10,18 +34,184 @@ def ensure_parent_dir(path: str | Path) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
 
 
-def write_df(df: pd.DataFrame, path: str | Path, fmt: Literal["parquet", "csv"] = "parquet") -> None:
+def _write_parquet_dataset(
+    table: pa.Table,
+    path: Path,
+    partition_cols: list[str],
+    options: dict[str, Any],
+) -> None:
+    """
+    Write `table` as a hive-partitioned parquet dataset rooted at `path`.
+
+    The data files do not carry the partition columns, so the full schema
+    (column order, key dtypes) and the partition columns are recorded in a
+    `_common_metadata` file for `_read_parquet_dataset`.
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    # Replace whatever a previous run left behind (a flat file or a dataset
+    # directory that may contain partitions we no longer write).
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+    options = dict(options)
+    row_group_size = options.pop("row_group_size")
+    file_format = ds.ParquetFileFormat()
+    ds.write_dataset(
+        table,
+        base_dir=path,
+        format=file_format,
+        partitioning=ds.partitioning(
+            table.schema.empty_table().select(partition_cols).schema,
+            flavor="hive",
+        ),
+        file_options=file_format.make_write_options(**options),
+        max_rows_per_group=row_group_size,
+        existing_data_behavior="overwrite_or_ignore",
+        preserve_order=True,
+    )
+    metadata = dict(table.schema.metadata or {})
+    metadata[_PARTITION_COLS_KEY] = json.dumps(partition_cols).encode()
+    pq.write_metadata(
+        table.schema.with_metadata(metadata), path / "_common_metadata"
+    )
+
+
+def _read_parquet_dataset(
+    path: Path,
+    columns: list[str] | None,
+    filters: list[tuple[str, str, Any]] | None,
+) -> pd.DataFrame:
+    """
+    Read a hive-partitioned dataset back as the frame that was written.
+
+    Columns keep their written order and dtypes (partition keys are not
+    re-inferred as trailing int32 columns), and partitions are read in key
+    order rather than path order, where "persona_id=10" < "persona_id=2".
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    common_metadata = path / "_common_metadata"
+    if common_metadata.exists():
+        schema = pq.read_schema(common_metadata)
+        partition_cols = json.loads(schema.metadata[_PARTITION_COLS_KEY])
+        partitioning = ds.partitioning(
+            pa.schema([schema.field(c) for c in partition_cols]), flavor="hive"
+        )
+        dataset = ds.dataset(
+            path, schema=schema, format="parquet", partitioning=partitioning
+        )
+    else:
+        # Written without the metadata file: fall back to discovery
+        dataset = ds.dataset(path, format="parquet", partitioning="hive")
+        partition_cols = dataset.partitioning.schema.names
+
+    fragments = sorted(
+        dataset.get_fragments(),
+        key=lambda f: tuple(
+            ds.get_partition_keys(f.partition_expression)[c] for c in partition_cols
+        ),
+    )
+    dataset = ds.FileSystemDataset(
+        fragments, dataset.schema, dataset.format, dataset.filesystem
+    )
+    filter_expr = pq.filters_to_expression(filters) if filters else None
+    return dataset.to_table(columns=columns, filter=filter_expr).to_pandas()
+
+
+def _write_parquet_file(
+    df: pd.DataFrame,
+    path: Path,
+    options: dict[str, Any],
+) -> None:
+    """
+    Write `df` to a single parquet file one row group at a time.
+
+    Only one row group's worth of rows is converted to Arrow at once, so a
+    multi-million-row frame with long string columns is not duplicated in
+    Arrow memory before it reaches disk.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    options = dict(options)
+    row_group_size = options.pop("row_group_size")
+    # Take the schema from the first row group; Schema.from_pandas on the
+    # whole frame would convert every string column just to infer its type.
+    # Object columns are re-checked with a (non-allocating) type scan in case
+    # the head slice is not representative (e.g. all-null so far).
+    schema = pa.Schema.from_pandas(df.iloc[:row_group_size], preserve_index=False)
+    for i, (name, dtype) in enumerate(df.dtypes.items()):
+        if dtype == object and (
+            pa.infer_type(df[name], from_pandas=True) != schema.field(i).type
+        ):
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            break
+    with pq.ParquetWriter(path, schema, **options) as writer:
+        for start in range(0, max(len(df), 1), row_group_size):
+            part = df.iloc[start : start + row_group_size]
+            writer.write_table(
+                pa.Table.from_pandas(part, schema=schema, preserve_index=False),
+                row_group_size=row_group_size,
+            )
+
+
+def write_df(
+    df: pd.DataFrame,
+    path: str | Path,
+    fmt: Literal["parquet", "csv"] = "parquet",
+    partition_cols: list[str] | None = None,
+    **parquet_options: Any,
+) -> None:
+    """
+    Write a DataFrame to parquet or csv.
+
+    `parquet_options` override the module defaults for parquet writes
+    (e.g. a smaller `row_group_size` for point-lookup tables). With
+    `partition_cols`, `path` becomes a directory holding one hive-style
+    partition (`col=value/`) per distinct key.
+    """
     path = Path(path)
     ensure_parent_dir(path)
     if fmt == "parquet":
-        df.to_parquet(path, index=False)
+        import pyarrow as pa
+
+        options = _PARQUET_WRITE_OPTIONS | parquet_options
+        if partition_cols:
+            # combine_chunks() gives each column a single contiguous buffer, so
+            # a frame assembled from many pieces is not written as many tiny
+            # pages.
+            table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+            _write_parquet_dataset(table, path, partition_cols, options)
+        else:
+            _write_parquet_file(df, path, options)
     elif fmt == "csv":
+        # Kept on pandas: pyarrow's writer quotes every string and spells
+        # nulls/bools differently, which changes the exported data/kg/*.csv.
         df.to_csv(path, index=False)
     else:
         raise ValueError(f"Unsupported format: {fmt}")
 
 
-def read_df(path: str | Path, fmt: Literal["parquet", "csv"] | None = None) -> pd.DataFrame:
+def read_df(
+    path: str | Path,
+    fmt: Literal["parquet", "csv"] | None = None,
+    columns: list[str] | None = None,
+    filters: list[tuple[str, str, Any]] | None = None,
+) -> pd.DataFrame:
+    """
+    Read a DataFrame from parquet or csv.
+
+    If `columns` is given, only those columns are read (for parquet, only
+    their column chunks are decoded). For parquet, `filters` such as
+    `[("persona_id", "=", 3)]` are pushed down to skip partitions and row
+    groups. A partitioned dataset directory is read as one frame.
+    """
     path = Path(path)
     if fmt is None:
         if path.suffix == ".parquet":
@@ -31,9 +221,15 @@ def read_df(path: str | Path, fmt: Literal["parquet", "csv"] | None = None) -> p
         else:
             raise ValueError(f"Could not infer format from extension: {path}")
 
+    import pandas as pd
+
     if fmt == "parquet":
-        return pd.read_parquet(path)
+        if path.is_dir():
+            return _read_parquet_dataset(path, columns, filters)
+        return pd.read_parquet(path, columns=columns, filters=filters)
     elif fmt == "csv":
-        return pd.read_csv(path)
+        if filters:
+            raise ValueError("filters are only supported for parquet")
+        return pd.read_csv(path, usecols=columns)
     else:
         raise ValueError(f"Unsupported format: {fmt}")
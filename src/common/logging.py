@@ -1,14 +1,38 @@
 from __future__ import annotations
+import atexit
 import logging
+import logging.handlers
+import queue
 from logging import Logger
 from pathlib import Path
 
 
+# One listener per configured logger. Each drains its queue to the real
+# console/file handlers on a background thread; all are stopped (and their
+# queues flushed) at interpreter exit.
+_LISTENERS: list[logging.handlers.QueueListener] = []
+
+
+def _stop_listeners() -> None:
+    for listener in _LISTENERS:
+        listener.stop()
+
+
+atexit.register(_stop_listeners)
+
+
 def setup_logger(
     name: str,
     level: int = logging.INFO,
     log_dir: str | Path | None = None,
 ) -> Logger:
+    """
+    Return a named logger whose records are written asynchronously.
+
+    The logger itself only enqueues records (no I/O on the caller's thread);
+    a QueueListener writes them to stderr and, if `log_dir` is set, to
+    `<log_dir>/<name>.log`.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
@@ -22,13 +46,22 @@ def setup_logger(
 
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers: list[logging.Handler] = [console_handler]
 
     if log_dir is not None:
         log_dir = Path(log_dir)
         log_dir.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_dir / f"{name}.log")
+        file_handler = logging.FileHandler(log_dir / f"{name}.log", delay=True)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    _LISTENERS.append(listener)
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     return logger
@@ -1,18 +1,42 @@
 from __future__ import annotations
+import copy
+import os
 import random
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import numpy as np
-import yaml
+# numpy / yaml are imported lazily to keep module import cheap.
+if TYPE_CHECKING:
+    import numpy as np
 
 
-def set_global_seed(seed: int) -> None:
+def set_global_seed(seed: int) -> np.random.Generator:
+    """Seed the legacy global RNGs and return a Generator for explicit use."""
+    import numpy as np
+
     random.seed(seed)
     np.random.seed(seed)
+    return np.random.default_rng(seed)
+
+
+@lru_cache(maxsize=32)
+def _parse_yaml(path: str, mtime_ns: int, size: int) -> Any:
+    # mtime/size are part of the key so an edited file is re-parsed
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=loader)
 
 
 def load_yaml(path: str | Path) -> dict[str, Any]:
-    path = Path(path)
-    with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    """
+    Parse a YAML file, caching the result per (path, mtime, size).
+
+    Callers get their own deep copy, so mutating it never leaks into the
+    cache.
+    """
+    path = os.fspath(path)
+    st = os.stat(path)
+    return copy.deepcopy(_parse_yaml(path, st.st_mtime_ns, st.st_size))
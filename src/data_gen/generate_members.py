@@ -13,33 +13,33 @@ from src.common.constants import (
     MEMBERSHIP_TYPES,
     SALES_DECILES,
     SALES_CENTILES,
+    MAX_SALES_DECILE,
+    MAX_SALES_CENTILE,
 )
 from src.common.io import write_df
 from src.common.schema import MembersSchema
 
 
-def _sample_tenure_months(tenure_bucket: np.ndarray) -> np.ndarray:
+def _sample_tenure_months(
+    tenure_bucket: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
     """Map tenure_bucket labels to approximate tenure_months."""
-    # Simple ranges per bucket
-    ranges = {
-        "0-3m": (0, 3),
-        "3-12m": (3, 12),
-        "1-3y": (12, 36),
-        "3y+": (36, 120),
-    }
-    mins = np.zeros_like(tenure_bucket, dtype=float)
-    maxs = np.zeros_like(tenure_bucket, dtype=float)
-
-    for label, (lo, hi) in ranges.items():
-        mask = tenure_bucket == label
-        mins[mask] = lo
-        maxs[mask] = hi
+    # Simple ranges per bucket, indexed by position in TENURE_BUCKETS.
+    # The trailing (0, 0) slot catches unknown labels (categorical code -1).
+    range_lo = np.array([0, 3, 12, 36, 0], dtype=float)
+    range_hi = np.array([3, 12, 36, 120, 0], dtype=float)
+
+    codes = pd.Categorical(tenure_bucket, categories=TENURE_BUCKETS).codes
 
     # Uniform within range, then round
-    return np.round(np.random.uniform(mins, maxs)).astype(int)
+    return np.round(rng.uniform(range_lo[codes], range_hi[codes])).astype(np.int16)
 
 
-def generate_members(cfg: Dict[str, Any], output_path: str | Path) -> pd.DataFrame:
+def generate_members(
+    cfg: Dict[str, Any],
+    output_path: str | Path,
+    rng: np.random.Generator | None = None,
+) -> pd.DataFrame:
     """
     Generate synthetic members data at membership_nbr level.
 
@@ -47,7 +47,12 @@ def generate_members(cfg: Dict[str, Any], output_path: str | Path) -> pd.DataFra
     - persona distribution across members
     - tenure buckets + tenure_months
     - basic membership and sales attributes
+
+    All draws come from `rng`; if not given, one is seeded from cfg["seed"].
     """
+    if rng is None:
+        rng = np.random.default_rng(cfg.get("seed"))
+
     n_members: int = int(cfg["n_members"])
     n_personas: int = int(cfg["n_personas"])
     tenure_buckets_cfg = cfg.get("tenure_buckets", TENURE_BUCKETS)
@@ -64,7 +69,7 @@ def generate_members(cfg: Dict[str, Any], output_path: str | Path) -> pd.DataFra
     base_probs[1] *= 1.1
     base_probs = base_probs / base_probs.sum()
 
-    persona_ids = np.random.choice(
+    persona_ids = rng.choice(
         np.arange(1, n_personas + 1),
         size=n_members,
         p=base_probs,
@@ -75,62 +80,78 @@ def generate_members(cfg: Dict[str, Any], output_path: str | Path) -> pd.DataFra
     tb_probs = np.array([0.15, 0.30, 0.30, 0.25])
     tb_probs = tb_probs / tb_probs.sum()
 
-    tenure_bucket = np.random.choice(tb_labels, size=n_members, p=tb_probs)
+    tenure_bucket = rng.choice(tb_labels, size=n_members, p=tb_probs)
 
     # 4. Membership tier: maybe more Club than Plus
     tier_probs = np.array([0.7, 0.3])
-    membership_tier = np.random.choice(
+    membership_tier = rng.choice(
         MEMBERSHIP_TIERS, size=n_members, p=tier_probs
     )
 
     # 5. Membership type: Savings vs Business
     type_probs = np.array([0.8, 0.2])
-    membership_type = np.random.choice(
+    membership_type = rng.choice(
         MEMBERSHIP_TYPES, size=n_members, p=type_probs
     )
 
     # 6. Auto renew opt-in: correlated with tenure (longer tenure → more opt-in)
-    auto_renew_opt_in = np.zeros(n_members, dtype=int)
-    for tb, prob in zip(tb_labels, [0.4, 0.55, 0.7, 0.8]):
-        mask = tenure_bucket == tb
-        auto_renew_opt_in[mask] = (
-            np.random.rand(mask.sum()) < prob
-        ).astype(int)
+    # One Bernoulli draw over all members, with per-row probabilities
+    # gathered from the member's tenure bucket.
+    opt_in_probs = np.array([0.4, 0.55, 0.7, 0.8])
+    tb_codes = pd.Categorical(tenure_bucket, categories=tb_labels).codes
+    auto_renew_opt_in = (
+        rng.random(n_members) < opt_in_probs[tb_codes]
+    ).astype(np.int8)
 
     # 7. Sales decile + centile: loosely correlated with tier and tenure
     # Higher tenure + Plus → higher spend, on average.
     # We'll just bias distributions a bit.
-    sales_decile = np.random.choice(SALES_DECILES, size=n_members)
-    sales_centile = np.random.choice(SALES_CENTILES, size=n_members)
+    # Drawn directly as int8 so the boost/clamp below runs on single bytes.
+    sales_decile = rng.integers(
+        SALES_DECILES[0], MAX_SALES_DECILE + 1, size=n_members, dtype=np.int8
+    )
+    sales_centile = rng.integers(
+        SALES_CENTILES[0], MAX_SALES_CENTILE + 1, size=n_members, dtype=np.int8
+    )
 
     plus_mask = membership_tier == "Plus"
     high_tenure_mask = np.isin(tenure_bucket, ["1-3y", "3y+"])
     boost_mask = plus_mask & high_tenure_mask
 
     # Shift some boosted members to higher deciles/centiles
+    n_boost = int(boost_mask.sum())
     sales_decile[boost_mask] = np.minimum(
-        sales_decile[boost_mask] + np.random.randint(1, 3, size=boost_mask.sum()),
-        max(SALES_DECILES),
+        sales_decile[boost_mask] + rng.integers(1, 3, size=n_boost, dtype=np.int8),
+        MAX_SALES_DECILE,
     )
     sales_centile[boost_mask] = np.minimum(
-        sales_centile[boost_mask] + np.random.randint(5, 20, size=boost_mask.sum()),
-        max(SALES_CENTILES),
+        sales_centile[boost_mask] + rng.integers(5, 20, size=n_boost, dtype=np.int8),
+        MAX_SALES_CENTILE,
     )
 
     # 8. Tenure months derived from bucket
-    tenure_months = _sample_tenure_months(tenure_bucket)
+    tenure_months = _sample_tenure_months(tenure_bucket, rng)
 
+    # Low-cardinality labels are stored as categoricals and numeric
+    # attributes as the narrowest dtype that fits, which keeps the frame
+    # small in memory and lets parquet dictionary-encode the labels.
     df = pd.DataFrame(
         {
             schema.membership_nbr: membership_nbr,
-            schema.persona_id: persona_ids,
-            schema.tenure_bucket: tenure_bucket,
-            schema.membership_tier: membership_tier,
-            schema.membership_type: membership_type,
-            schema.auto_renew_opt_in: auto_renew_opt_in,
+            schema.persona_id: persona_ids.astype(np.int16),
+            schema.tenure_bucket: pd.Categorical(
+                tenure_bucket, categories=tb_labels
+            ),
+            schema.membership_tier: pd.Categorical(
+                membership_tier, categories=MEMBERSHIP_TIERS
+            ),
+            schema.membership_type: pd.Categorical(
+                membership_type, categories=MEMBERSHIP_TYPES
+            ),
+            schema.auto_renew_opt_in: auto_renew_opt_in.astype(np.int8),
             schema.sales_decile: sales_decile,
             schema.sales_centile: sales_centile,
-            schema.tenure_months: tenure_months,
+            schema.tenure_months: tenure_months.astype(np.int16),
         }
     )
 
@@ -17,112 +17,141 @@ def _build_entity_index(entity_specs: Dict[str, int]) -> pd.DataFrame:
     Expand entity_specs into a full entity index:
     entity_type, entity_id, entity_name.
     """
-    rows: List[dict] = []
+    types: List[np.ndarray] = []
+    ids: List[np.ndarray] = []
+    names: List[np.ndarray] = []
     for e_type, count in entity_specs.items():
-        for eid in range(1, count + 1):
-            rows.append(
-                {
-                    "entity_type": e_type,
-                    "entity_id": eid,
-                    "entity_name": f"{e_type.upper()}_{eid:03d}",
-                }
-            )
-    return pd.DataFrame(rows)
-
-
-def generate_nba_uplift(cfg: Dict[str, Any], output_path: str | Path) -> pd.DataFrame:
+        eids = np.arange(1, count + 1)
+        types.append(np.full(count, e_type, dtype=object))
+        ids.append(eids)
+        # Same as f"{e_type.upper()}_{eid:03d}"
+        padded_ids = np.char.zfill(eids.astype(str), 3)
+        names.append(np.char.add(f"{e_type.upper()}_", padded_ids).astype(object))
+
+    if not types:
+        return pd.DataFrame(
+            {
+                "entity_type": np.array([], dtype=object),
+                "entity_id": np.array([], dtype=np.int64),
+                "entity_name": np.array([], dtype=object),
+            }
+        )
+
+    return pd.DataFrame(
+        {
+            "entity_type": np.concatenate(types),
+            "entity_id": np.concatenate(ids),
+            "entity_name": np.concatenate(names),
+        }
+    )
+
+
+def generate_nba_uplift(
+    cfg: Dict[str, Any],
+    output_path: str | Path,
+    rng: np.random.Generator | None = None,
+) -> pd.DataFrame:
     """
     Generate synthetic NBA uplift summary, mimicking a synthetic-control pipeline.
 
     Grain: persona_id, tenure_bucket, entity_type, entity_id
+
+    Pass `rng` to share a Generator across generators; otherwise one is
+    seeded from cfg["seed"].
     """
+    if rng is None:
+        rng = np.random.default_rng(cfg.get("seed"))
+
     n_personas: int = int(cfg["n_personas"])
     tenure_buckets_cfg = cfg.get("tenure_buckets", TENURE_BUCKETS)
     entity_specs: Dict[str, int] = cfg["entity_specs"] if "entity_specs" in cfg else {}
 
     schema = NbaUpliftSchema()
 
-    # 1. Build base entity index
-    entity_idx = _build_entity_index(entity_specs)
-
     # Sanity: ensure we only use known entity types
-    if not set(entity_idx["entity_type"]).issubset(set(ENTITY_TYPES)):
-        unknown = set(entity_idx["entity_type"]) - set(ENTITY_TYPES)
+    used_types = {e_type for e_type, count in entity_specs.items() if count > 0}
+    if not used_types.issubset(set(ENTITY_TYPES)):
+        unknown = used_types - set(ENTITY_TYPES)
         raise ValueError(f"Unknown entity types in config: {unknown}")
 
-    rows: List[dict] = []
+    # 1. Build base entity index, pulled out as plain arrays once
+    entity_idx = _build_entity_index(entity_specs)
+    etype_arr = entity_idx["entity_type"].to_numpy()
+    eid_arr = entity_idx["entity_id"].to_numpy()
+    ename_arr = entity_idx["entity_name"].to_numpy()
 
-    # 2. For each persona × tenure × entity, simulate uplift metrics
+    # 2. For each persona × tenure × entity, simulate uplift metrics.
+    # Rows are laid out persona-major, then tenure, then entity, and every
+    # metric is computed as a whole-array op over that flat layout.
     persona_ids = np.arange(1, n_personas + 1)
     tb_labels = np.array(tenure_buckets_cfg)
 
-    for persona_id in persona_ids:
-        for tb in tb_labels:
-            # persona/tenure specific “base” renewal rate
-            # e.g., early tenure slightly lower, long-tenure higher
-            if tb == "0-3m":
-                base_control = 0.55
-            elif tb == "3-12m":
-                base_control = 0.65
-            elif tb == "1-3y":
-                base_control = 0.8
-            else:  # "3y+"
-                base_control = 0.9
-
-            # persona effect: some personas renew more easily
-            persona_factor = 1.0 + (persona_id - 3) * 0.02  # small +/- shift
-            base_control = np.clip(base_control * persona_factor, 0.4, 0.98)
-
-            # For this (persona, tb), create metrics for all entities
-            for _, erow in entity_idx.iterrows():
-                e_type = erow["entity_type"]
-                e_id = int(erow["entity_id"])
-                e_name = erow["entity_name"]
-
-                # Sample sizes: categories/sub-categories typically get more traffic
-                if e_type == "action":
-                    n_test = np.random.randint(500, 3000)
-                    n_control = np.random.randint(500, 3000)
-                elif e_type == "service":
-                    n_test = np.random.randint(2000, 8000)
-                    n_control = np.random.randint(2000, 8000)
-                elif e_type == "category":
-                    n_test = np.random.randint(5000, 20000)
-                    n_control = np.random.randint(5000, 20000)
-                else:  # sub_category
-                    n_test = np.random.randint(2000, 15000)
-                    n_control = np.random.randint(2000, 15000)
-
-                # Control rate: jitter around base_control
-                control_rate = np.clip(
-                    np.random.normal(loc=base_control, scale=0.03), 0.3, 0.99
-                )
-
-                # Uplift: small positive or negative effect; slightly more positives
-                uplift = np.random.normal(loc=0.01, scale=0.015)
-                uplift = np.clip(uplift, -0.05, 0.08)
-
-                test_rate = np.clip(control_rate + uplift, 0.3, 0.995)
-
-                rows.append(
-                    {
-                        schema.persona_id: persona_id,
-                        schema.tenure_bucket: tb,
-                        schema.entity_type: e_type,
-                        schema.entity_id: e_id,
-                        schema.entity_name: e_name,
-                        schema.n_test_matched: n_test,
-                        schema.n_control_matched: n_control,
-                        schema.test_renewal_rate: test_rate,
-                        schema.control_renewal_rate: control_rate,
-                        schema.incremental_renewal_rate: test_rate - control_rate,
-                        # rank to be filled later
-                        schema.incremental_rank: None,
-                        schema.uplift_method: "synthetic_control",
-                    }
-                )
-
-    df = pd.DataFrame(rows)
+    n_p, n_t, n_e = len(persona_ids), len(tb_labels), len(etype_arr)
+    n_rows = n_p * n_t * n_e
+
+    p_idx = np.repeat(np.arange(n_p), n_t * n_e)
+    t_idx = np.tile(np.repeat(np.arange(n_t), n_e), n_p)
+    e_idx = np.tile(np.arange(n_e), n_p * n_t)
+
+    # persona/tenure specific “base” renewal rate
+    # e.g., early tenure slightly lower, long-tenure higher
+    base_by_tb = {"0-3m": 0.55, "3-12m": 0.65, "1-3y": 0.8, "3y+": 0.9}
+    base_lut = np.array([base_by_tb.get(tb, 0.9) for tb in tb_labels])
+
+    # persona effect: some personas renew more easily
+    persona_factor = 1.0 + (persona_ids - 3) * 0.02  # small +/- shift
+
+    # (P, T) grid of base rates, clipped once and gathered per row
+    base_control_grid = np.clip(
+        base_lut[None, :] * persona_factor[:, None], 0.4, 0.98
+    )
+    base_control = base_control_grid[p_idx, t_idx]
+
+    # Sample sizes: categories/sub-categories typically get more traffic
+    sample_size_ranges = {
+        "action": (500, 3000),
+        "service": (2000, 8000),
+        "category": (5000, 20000),
+        "sub_category": (2000, 15000),
+    }
+    size_lo = np.array([lo for lo, _ in sample_size_ranges.values()])
+    size_hi = np.array([hi for _, hi in sample_size_ranges.values()])
+
+    e_types = etype_arr[e_idx]
+    e_codes = pd.Categorical(e_types, categories=list(sample_size_ranges)).codes
+
+    # All random draws happen up front in one call per distribution:
+    # row 0/1 of each block feed the test/control (resp. control/uplift) side.
+    n_test, n_control = rng.integers(
+        size_lo[e_codes], size_hi[e_codes], size=(2, n_rows)
+    )
+    control_noise, uplift_noise = rng.standard_normal(size=(2, n_rows))
+
+    # Control rate: jitter around base_control
+    control_rate = np.clip(base_control + 0.03 * control_noise, 0.3, 0.99)
+
+    # Uplift: small positive or negative effect; slightly more positives
+    uplift = np.clip(0.01 + 0.015 * uplift_noise, -0.05, 0.08)
+
+    test_rate = np.clip(control_rate + uplift, 0.3, 0.995)
+
+    df = pd.DataFrame(
+        {
+            schema.persona_id: persona_ids[p_idx],
+            schema.tenure_bucket: tb_labels[t_idx],
+            schema.entity_type: e_types,
+            schema.entity_id: eid_arr[e_idx],
+            schema.entity_name: ename_arr[e_idx],
+            schema.n_test_matched: n_test,
+            schema.n_control_matched: n_control,
+            schema.test_renewal_rate: test_rate,
+            schema.control_renewal_rate: control_rate,
+            schema.incremental_renewal_rate: test_rate - control_rate,
+            # rank to be filled later
+            schema.incremental_rank: None,
+            schema.uplift_method: "synthetic_control",
+        }
+    )
 
     # 3. Compute incremental_rank within each persona × tenure × entity_type
     df.sort_values(
@@ -136,13 +165,18 @@ def generate_nba_uplift(cfg: Dict[str, Any], output_path: str | Path) -> pd.Data
         inplace=True,
     )
 
+    # Rows are already ordered by uplift (desc) within each group, so the
+    # rank is just the running position inside the group.
     df[schema.incremental_rank] = (
         df.groupby(
-            [schema.persona_id, schema.tenure_bucket, schema.entity_type]
-        )[schema.incremental_renewal_rate]
-        .rank(method="first", ascending=False)
-        .astype(int)
+            [schema.persona_id, schema.tenure_bucket, schema.entity_type],
+            sort=False,
+        )
+        .cumcount()
+        .astype(np.int32)
+        + 1
     )
 
-    write_df(df, output_path, fmt="parquet")
+    # Partitioned by persona so per-persona reads only open that partition
+    write_df(df, output_path, fmt="parquet", partition_cols=[schema.persona_id])
     return df
@@ -15,7 +15,7 @@ def main() -> None:
 
     cfg = load_yaml(cfg_path)
     seed = int(cfg.get("seed", 42))
-    set_global_seed(seed)
+    rng = set_global_seed(seed)
 
     logger = setup_logger("data_gen", log_dir=project_root / "data" / "logs")
     logger.info("Loaded config from %s", cfg_path)
@@ -26,13 +26,13 @@ def main() -> None:
     # 1. Generate members
     members_path = project_root / files_cfg["members_parquet"]
     logger.info("Generating members → %s", members_path)
-    members_df = generate_members(cfg, output_path=members_path)
+    members_df = generate_members(cfg, output_path=members_path, rng=rng)
     logger.info("Members generated: %d rows", len(members_df))
 
     # 2. Generate NBA uplift summary
     nba_path = project_root / files_cfg["nba_uplift_parquet"]
     logger.info("Generating NBA uplift summary → %s", nba_path)
-    nba_df = generate_nba_uplift(cfg, output_path=nba_path)
+    nba_df = generate_nba_uplift(cfg, output_path=nba_path, rng=rng)
     logger.info("NBA uplift rows: %d", len(nba_df))
 
     logger.info("Data generation completed.")
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from typing import Dict, Any
 
+import numexpr as ne
 import numpy as np
 import pandas as pd
 
@@ -16,13 +17,16 @@ def _compute_engagement_bucket(sales_decile: pd.Series) -> pd.Series:
     4–7  -> medium
     8–10 -> high
     """
-    conditions = [
-        sales_decile <= 3,
-        (sales_decile >= 4) & (sales_decile <= 7),
-        sales_decile >= 8,
-    ]
-    choices = ["low", "medium", "high"]
-    return np.select(conditions, choices, default="medium")
+    # Build category codes directly; NaN and values between the bands
+    # (e.g. 7.5) compare False on both sides and fall back to "medium".
+    deciles = pd.to_numeric(sales_decile, errors="coerce").to_numpy(dtype=float)
+    codes = np.ones(len(deciles), dtype=np.int8)
+    codes[deciles <= 3] = 0
+    codes[deciles >= 8] = 2
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=["low", "medium", "high"]),
+        index=sales_decile.index,
+    )
 
 
 def _compute_churn_risk_flag(
@@ -38,12 +42,13 @@ def _compute_churn_risk_flag(
         * engagement_bucket == 'low'
       else low risk.
     """
-    high_risk = (
-        (tenure_months < 12)
-        & (auto_renew_opt_in == 0)
-        & (engagement_bucket == "low")
-    )
-    return high_risk.astype(int)
+    # numexpr fuses the three compares into one pass over the arrays
+    # instead of materializing a temporary mask per condition.
+    tm = tenure_months.to_numpy()
+    ar = auto_renew_opt_in.to_numpy()
+    eb = (engagement_bucket == "low").to_numpy()
+    high_risk = ne.evaluate("(tm < 12) & (ar == 0) & eb")
+    return pd.Series(high_risk.astype(np.int8), index=tenure_months.index)
 
 
 def build_member_features(
@@ -64,17 +69,20 @@ def build_member_features(
     if missing:
         raise ValueError(f"Missing required columns in members_df: {missing}")
 
-    df = members_df.copy()
-
     # Engagement bucket from sales_decile
-    df["engagement_bucket"] = _compute_engagement_bucket(df[schema.sales_decile])
+    engagement_bucket = _compute_engagement_bucket(members_df[schema.sales_decile])
 
     # Churn risk flag from tenure, auto-renew, engagement
-    df["churn_risk_flag"] = _compute_churn_risk_flag(
-        tenure_months=df[schema.tenure_months],
-        auto_renew_opt_in=df[schema.auto_renew_opt_in],
-        engagement_bucket=df["engagement_bucket"],
+    churn_risk_flag = _compute_churn_risk_flag(
+        tenure_months=members_df[schema.tenure_months],
+        auto_renew_opt_in=members_df[schema.auto_renew_opt_in],
+        engagement_bucket=engagement_bucket,
     )
 
+    # assign() returns a new frame with the derived columns without an
+    # explicit up-front copy of members_df.
     # You can add more derived features later; keep it simple for now.
-    return df
\ No newline at end of file
+    return members_df.assign(
+        engagement_bucket=engagement_bucket,
+        churn_risk_flag=churn_risk_flag,
+    )
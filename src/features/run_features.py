@@ -6,6 +6,7 @@ from pathlib import Path
 from src.common.utils import load_yaml
 from src.common.io import read_df, write_df
 from src.common.logging import setup_logger
+from src.common.schema import MembersSchema
 from src.features.build_member_features import build_member_features
 
 
@@ -28,7 +29,7 @@ def main() -> None:
         )
 
     logger.info("Loading members from %s", members_path)
-    members_df = read_df(members_path)
+    members_df = read_df(members_path, columns=MembersSchema().columns())
 
     logger.info("Building member_features table...")
     member_features_df = build_member_features(members_df, cfg=data_gen_cfg)
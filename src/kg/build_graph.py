@@ -1,15 +1,24 @@
 # src/kg/build_graph.py
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Any, Callable, Dict, List
 
 import numpy as np
 import pandas as pd
 
 from src.common.schema import NbaUpliftSchema
 
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover - polars is optional
+    pl = None
+
+
+EDGE_TYPES = ["persona_entity", "tenure_entity", "segment_entity"]
+
 
 @dataclass(frozen=True)
 class KGNodeSchema:
@@ -35,20 +44,70 @@ class KGEdgeSchema:
     entity_id: str = "entity_id"
 
 
-def _persona_node_id(persona_id: int | str) -> str:
-    return f"persona:{int(persona_id)}"
+def _via_uniques(build: Callable[..., pd.Series], *cols: pd.Series) -> pd.Series:
+    """
+    Apply the string builder `build` to the distinct key tuples of `cols`
+    only, then gather the result back to every row.
 
+    Uplift tables repeat each persona / tenure / entity many times, so this
+    formats a few thousand strings instead of one per row; the gather is a
+    plain pointer take.
+    """
+    if len(cols) == 1:
+        codes, uniques = pd.factorize(cols[0], sort=False, use_na_sentinel=False)
+        ids = build(pd.Series(uniques)).to_numpy()
+    else:
+        keys = pd.concat(cols, axis=1, keys=range(len(cols)))
+        codes = (
+            keys.groupby(list(keys.columns), sort=False, observed=True, dropna=False)
+            .ngroup()
+            .to_numpy()
+        )
+        # ngroup(sort=False) numbers groups in order of first appearance
+        first = keys[~keys.duplicated()]
+        ids = build(*(first[c] for c in keys.columns)).to_numpy()
+    return pd.Series(ids[codes], index=cols[0].index)
 
-def _tenure_node_id(tenure_bucket: str) -> str:
-    return f"tenure:{tenure_bucket}"
 
+def _persona_node_ids(persona_id: pd.Series) -> pd.Series:
+    return _via_uniques(
+        lambda p: "persona:" + p.astype("int64").astype(str), persona_id
+    )
 
-def _entity_node_id(entity_type: str, entity_id: int | str) -> str:
-    return f"entity:{entity_type}:{int(entity_id)}"
 
+def _tenure_node_ids(tenure_bucket: pd.Series) -> pd.Series:
+    return _via_uniques(lambda t: "tenure:" + t.astype(str), tenure_bucket)
 
-def _segment_node_id(persona_id: int | str, tenure_bucket: str) -> str:
-    return f"segment:p{int(persona_id)}:t{tenure_bucket}"
+
+def _entity_node_ids(entity_type: pd.Series, entity_id: pd.Series) -> pd.Series:
+    return _via_uniques(
+        lambda et, eid: "entity:"
+        + et.astype(str).str.cat(eid.astype("int64").astype(str), sep=":"),
+        entity_type,
+        entity_id,
+    )
+
+
+def _segment_node_ids(persona_id: pd.Series, tenure_bucket: pd.Series) -> pd.Series:
+    return _via_uniques(
+        lambda p, t: "segment:p" + p.astype("int64").astype(str) + ":t" + t.astype(str),
+        persona_id,
+        tenure_bucket,
+    )
+
+
+def _categorize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return `df` with entity_type and tenure_bucket as categoricals, so dedup
+    hashes small integer codes instead of strings. No-op if they already are.
+    """
+    schema = NbaUpliftSchema()
+    to_cast = {
+        col: "category"
+        for col in (schema.entity_type, schema.tenure_bucket)
+        if not isinstance(df[col].dtype, pd.CategoricalDtype)
+    }
+    return df.astype(to_cast) if to_cast else df
 
 
 def build_kg_nodes(uplift_df: pd.DataFrame) -> pd.DataFrame:
@@ -58,239 +117,229 @@ def build_kg_nodes(uplift_df: pd.DataFrame) -> pd.DataFrame:
     schema = NbaUpliftSchema()
     kg_schema = KGNodeSchema()
 
-    # Persona nodes
-    persona_nodes = (
-        uplift_df[[schema.persona_id]]
-        .drop_duplicates()
-        .assign(
-            **{
-                kg_schema.node_id: lambda df: df[schema.persona_id].apply(
-                    _persona_node_id
-                ),
-                kg_schema.node_type: "persona",
-                kg_schema.label: lambda df: "Persona "
-                + df[schema.persona_id].astype(str),
-                kg_schema.tenure_bucket: np.nan,
-                kg_schema.entity_type: np.nan,
-                kg_schema.entity_id: np.nan,
-            }
-        )[
-            [
-                kg_schema.node_id,
-                kg_schema.node_type,
-                kg_schema.label,
-                kg_schema.persona_id,
-                kg_schema.tenure_bucket,
-                kg_schema.entity_type,
-                kg_schema.entity_id,
-            ]
-        ]
-    )
-
-    # Tenure nodes
-    tenure_nodes = (
-        uplift_df[[schema.tenure_bucket]]
-        .drop_duplicates()
-        .assign(
-            **{
-                kg_schema.node_id: lambda df: df[schema.tenure_bucket].apply(
-                    _tenure_node_id
-                ),
-                kg_schema.node_type: "tenure",
-                kg_schema.label: lambda df: df[schema.tenure_bucket],
-                kg_schema.persona_id: np.nan,
-                kg_schema.entity_type: np.nan,
-                kg_schema.entity_id: np.nan,
-            }
-        )[
-            [
-                kg_schema.node_id,
-                kg_schema.node_type,
-                kg_schema.label,
-                kg_schema.persona_id,
-                kg_schema.tenure_bucket,
-                kg_schema.entity_type,
-                kg_schema.entity_id,
-            ]
-        ]
-    )
-
-    # Entity nodes
-    entity_nodes = (
+    df = _categorize(
         uplift_df[
             [
+                schema.persona_id,
+                schema.tenure_bucket,
                 schema.entity_type,
                 schema.entity_id,
                 schema.entity_name,
             ]
         ]
-        .drop_duplicates()
-        .assign(
-            **{
-                kg_schema.node_id: lambda df: df.apply(
-                    lambda row: _entity_node_id(
-                        row[schema.entity_type], row[schema.entity_id]
-                    ),
-                    axis=1,
-                ),
-                kg_schema.node_type: "entity",
-                kg_schema.label: lambda df: df[schema.entity_name],
-                kg_schema.persona_id: np.nan,
-                kg_schema.tenure_bucket: np.nan,
-            }
-        )[
-            [
-                kg_schema.node_id,
-                kg_schema.node_type,
-                kg_schema.label,
-                kg_schema.persona_id,
-                kg_schema.tenure_bucket,
-                schema.entity_type,
-                schema.entity_id,
-            ]
-        ]
-        .rename(
-            columns={
-                schema.entity_type: kg_schema.entity_type,
-                schema.entity_id: kg_schema.entity_id,
-            }
-        )
     )
 
-    # Segment nodes: persona × tenure
-    segment_nodes = (
-        uplift_df[[schema.persona_id, schema.tenure_bucket]]
-        .drop_duplicates()
-        .assign(
-            **{
-                kg_schema.node_id: lambda df: df.apply(
-                    lambda row: _segment_node_id(
-                        row[schema.persona_id], row[schema.tenure_bucket]
-                    ),
-                    axis=1,
-                ),
-                kg_schema.node_type: "segment",
-                kg_schema.label: lambda df: df.apply(
-                    lambda row: f"Persona {row[schema.persona_id]} | {row[schema.tenure_bucket]}",
-                    axis=1,
-                ),
-                kg_schema.entity_type: np.nan,
-                kg_schema.entity_id: np.nan,
-            }
-        )[
+    personas = df[schema.persona_id].drop_duplicates()
+    tenures = df[schema.tenure_bucket].drop_duplicates()
+    entities = df[
+        [schema.entity_type, schema.entity_id, schema.entity_name]
+    ].drop_duplicates()
+    segments = df[[schema.persona_id, schema.tenure_bucket]].drop_duplicates()
+
+    n_p, n_t, n_e, n_s = len(personas), len(tenures), len(entities), len(segments)
+
+    def _col(*blocks: Any) -> np.ndarray:
+        # One block per node type, in persona/tenure/entity/segment order;
+        # None stands for "not applicable" and becomes NaN.
+        sizes = (n_p, n_t, n_e, n_s)
+        return np.concatenate(
             [
-                kg_schema.node_id,
-                kg_schema.node_type,
-                kg_schema.label,
-                schema.persona_id,
-                schema.tenure_bucket,
-                kg_schema.entity_type,
-                kg_schema.entity_id,
+                np.full(size, np.nan, dtype=object)
+                if block is None
+                else np.asarray(block, dtype=object)
+                for block, size in zip(blocks, sizes)
             ]
-        ]
-        .rename(
-            columns={
-                schema.persona_id: kg_schema.persona_id,
-                schema.tenure_bucket: kg_schema.tenure_bucket,
-            }
         )
-    )
 
-    nodes = pd.concat(
-        [persona_nodes, tenure_nodes, entity_nodes, segment_nodes],
-        axis=0,
-        ignore_index=True,
-    ).drop_duplicates(subset=[kg_schema.node_id])
+    seg_pid = segments[schema.persona_id]
+    seg_tb = segments[schema.tenure_bucket]
+
+    # Id blocks are independent of each other, so build them concurrently
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        id_blocks = [
+            ex.submit(_persona_node_ids, personas),
+            ex.submit(_tenure_node_ids, tenures),
+            ex.submit(
+                _entity_node_ids,
+                entities[schema.entity_type],
+                entities[schema.entity_id],
+            ),
+            ex.submit(_segment_node_ids, seg_pid, seg_tb),
+        ]
+        node_id = _col(*(f.result() for f in id_blocks))
+
+    # Keep the first node for each id
+    keep = ~pd.Index(node_id).duplicated()
+
+    nodes = pd.DataFrame(
+        {
+            kg_schema.node_id: node_id,
+            kg_schema.node_type: np.repeat(
+                np.array(["persona", "tenure", "entity", "segment"], dtype=object),
+                [n_p, n_t, n_e, n_s],
+            ),
+            kg_schema.label: _col(
+                "Persona " + personas.astype(str),
+                tenures,
+                entities[schema.entity_name],
+                "Persona " + seg_pid.astype(str) + " | " + seg_tb.astype(str),
+            ),
+            kg_schema.persona_id: _col(personas, None, None, seg_pid).astype(float),
+            kg_schema.tenure_bucket: pd.Categorical(
+                _col(None, tenures, None, seg_tb),
+                categories=df[schema.tenure_bucket].cat.categories,
+            ),
+            kg_schema.entity_type: pd.Categorical(
+                _col(None, None, entities[schema.entity_type], None),
+                categories=df[schema.entity_type].cat.categories,
+            ),
+            kg_schema.entity_id: _col(
+                None, None, entities[schema.entity_id], None
+            ).astype(float),
+        }
+    )[keep].reset_index(drop=True)
 
     return nodes
 
 
-def build_kg_edges(
-    uplift_df: pd.DataFrame,
-    min_uplift_for_edge: float = 0.0,
-) -> pd.DataFrame:
+def _build_kg_edges_polars(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Build KG edges from uplift summary:
-    - persona_entity
-    - tenure_entity
-    - segment_entity
+    Polars version of the edge build in `build_kg_edges`: same rows, order
+    and dtypes, but every step runs as a multi-threaded lazy Arrow query.
     """
     schema = NbaUpliftSchema()
     kg_schema = KGEdgeSchema()
 
-    df = uplift_df.copy()
-
-    # Filter by uplift threshold if configured
-    if min_uplift_for_edge is not None and min_uplift_for_edge > 0:
-        df = df[df[schema.incremental_renewal_rate] >= min_uplift_for_edge]
+    lf = (
+        pl.from_pandas(df)
+        .lazy()
+        .with_columns(pl.col(schema.tenure_bucket, schema.entity_type).cast(pl.Utf8))
+        # dst_id and support are the same for all three edge types: add them
+        # once and let each edge frame select them.
+        .with_columns(
+            (
+                pl.lit("entity:")
+                + pl.col(schema.entity_type)
+                + pl.lit(":")
+                + pl.col(schema.entity_id).cast(pl.Int64).cast(pl.Utf8)
+            ).alias(kg_schema.dst_id),
+            (pl.col(schema.n_test_matched) + pl.col(schema.n_control_matched)).alias(
+                kg_schema.support
+            ),
+        )
+    )
 
-    # Support = total matched population
-    support = df[schema.n_test_matched] + df[schema.n_control_matched]
+    pid = pl.col(schema.persona_id).cast(pl.Int64).cast(pl.Utf8)
+    tb = pl.col(schema.tenure_bucket)
+    entity_keys = [schema.entity_type, schema.entity_id]
+    edge_specs = [
+        ("persona_entity", [schema.persona_id, *entity_keys], pl.lit("persona:") + pid),
+        ("tenure_entity", [schema.tenure_bucket, *entity_keys], pl.lit("tenure:") + tb),
+        (
+            "segment_entity",
+            [schema.persona_id, schema.tenure_bucket, *entity_keys],
+            pl.lit("segment:p") + pid + pl.lit(":t") + tb,
+        ),
+    ]
+
+    def _edge_frame(edge_type: str, key_cols: List[str], src_expr: Any) -> Any:
+        return lf.unique(subset=key_cols, keep="first", maintain_order=True).select(
+            src_expr.alias(kg_schema.src_id),
+            pl.col(kg_schema.dst_id),
+            pl.lit(edge_type).alias(kg_schema.edge_type),
+            pl.col(schema.incremental_renewal_rate).alias(kg_schema.weight),
+            pl.col(kg_schema.support),
+            pl.col(schema.persona_id).alias(kg_schema.persona_id),
+            pl.col(schema.tenure_bucket).alias(kg_schema.tenure_bucket),
+            pl.col(schema.entity_type).alias(kg_schema.entity_type),
+            pl.col(schema.entity_id).alias(kg_schema.entity_id),
+        )
 
-    # persona_entity edges
-    persona_edges = pd.DataFrame(
-        {
-            kg_schema.src_id: df[schema.persona_id].apply(_persona_node_id),
-            kg_schema.dst_id: df.apply(
-                lambda row: _entity_node_id(
-                    row[schema.entity_type], row[schema.entity_id]
-                ),
-                axis=1,
-            ),
-            kg_schema.edge_type: "persona_entity",
-            kg_schema.weight: df[schema.incremental_renewal_rate],
-            kg_schema.support: support,
-            kg_schema.persona_id: df[schema.persona_id],
-            kg_schema.tenure_bucket: df[schema.tenure_bucket],
-            kg_schema.entity_type: df[schema.entity_type],
-            kg_schema.entity_id: df[schema.entity_id],
-        }
+    edges = (
+        pl.concat([_edge_frame(*spec) for spec in edge_specs])
+        .unique(
+            subset=[kg_schema.src_id, kg_schema.dst_id, kg_schema.edge_type],
+            keep="first",
+            maintain_order=True,
+        )
+        .collect()
+        .rechunk()
+        .to_pandas()
     )
 
-    # tenure_entity edges
-    tenure_edges = pd.DataFrame(
+    # Hand back the same categorical dtypes as the pandas path
+    return edges.astype(
         {
-            kg_schema.src_id: df[schema.tenure_bucket].apply(_tenure_node_id),
-            kg_schema.dst_id: df.apply(
-                lambda row: _entity_node_id(
-                    row[schema.entity_type], row[schema.entity_id]
-                ),
-                axis=1,
-            ),
-            kg_schema.edge_type: "tenure_entity",
-            kg_schema.weight: df[schema.incremental_renewal_rate],
-            kg_schema.support: support,
-            kg_schema.persona_id: df[schema.persona_id],
-            kg_schema.tenure_bucket: df[schema.tenure_bucket],
-            kg_schema.entity_type: df[schema.entity_type],
-            kg_schema.entity_id: df[schema.entity_id],
+            kg_schema.tenure_bucket: df[schema.tenure_bucket].dtype,
+            kg_schema.entity_type: df[schema.entity_type].dtype,
         }
     )
 
-    # segment_entity edges
-    segment_edges = pd.DataFrame(
-        {
-            kg_schema.src_id: df.apply(
-                lambda row: _segment_node_id(
-                    row[schema.persona_id], row[schema.tenure_bucket]
-                ),
-                axis=1,
-            ),
-            kg_schema.dst_id: df.apply(
-                lambda row: _entity_node_id(
-                    row[schema.entity_type], row[schema.entity_id]
-                ),
-                axis=1,
+
+def _build_kg_edges_pandas(df: pd.DataFrame) -> pd.DataFrame:
+    """pandas edge build used by `build_kg_edges` when polars is unavailable."""
+    schema = NbaUpliftSchema()
+    kg_schema = KGEdgeSchema()
+
+    # Entity ids and support are the same for all three edge types and the
+    # segment edges need them for every uplift row, so build them once and
+    # share them.
+    entity_ids = _entity_node_ids(df[schema.entity_type], df[schema.entity_id])
+    # Support = total matched population
+    support = df[schema.n_test_matched] + df[schema.n_control_matched]
+
+    def _edge_frame(
+        edge_type: str, key_cols: List[str], src_fn: Any
+    ) -> pd.DataFrame:
+        # Keep the first row per (src, dst) key before building any src ids;
+        # persona/tenure edges repeat once per tenure/persona otherwise.
+        mask = ~df.duplicated(subset=key_cols)
+        if mask.all():
+            # Segment keys are the uplift grain: reuse the shared columns as-is
+            rows, dst_ids, row_support = df, entity_ids, support
+        else:
+            rows, dst_ids, row_support = df[mask], entity_ids[mask], support[mask]
+        return pd.DataFrame(
+            {
+                kg_schema.src_id: src_fn(rows),
+                kg_schema.dst_id: dst_ids,
+                kg_schema.edge_type: edge_type,
+                kg_schema.weight: rows[schema.incremental_renewal_rate],
+                kg_schema.support: row_support,
+                kg_schema.persona_id: rows[schema.persona_id],
+                kg_schema.tenure_bucket: rows[schema.tenure_bucket],
+                kg_schema.entity_type: rows[schema.entity_type],
+                kg_schema.entity_id: rows[schema.entity_id],
+            }
+        )
+
+    entity_keys = [schema.entity_type, schema.entity_id]
+    edge_specs = [
+        (
+            "persona_entity",
+            [schema.persona_id, *entity_keys],
+            lambda rows: _persona_node_ids(rows[schema.persona_id]),
+        ),
+        (
+            "tenure_entity",
+            [schema.tenure_bucket, *entity_keys],
+            lambda rows: _tenure_node_ids(rows[schema.tenure_bucket]),
+        ),
+        (
+            "segment_entity",
+            [schema.persona_id, schema.tenure_bucket, *entity_keys],
+            lambda rows: _segment_node_ids(
+                rows[schema.persona_id], rows[schema.tenure_bucket]
             ),
-            kg_schema.edge_type: "segment_entity",
-            kg_schema.weight: df[schema.incremental_renewal_rate],
-            kg_schema.support: support,
-            kg_schema.persona_id: df[schema.persona_id],
-            kg_schema.tenure_bucket: df[schema.tenure_bucket],
-            kg_schema.entity_type: df[schema.entity_type],
-            kg_schema.entity_id: df[schema.entity_id],
-        }
-    )
+        ),
+    ]
+
+    # The three edge types only read `df`, so they are built concurrently;
+    # dedup hashing and the numpy kernels release the GIL.
+    with ThreadPoolExecutor(max_workers=len(edge_specs)) as ex:
+        persona_edges, tenure_edges, segment_edges = ex.map(
+            lambda spec: _edge_frame(*spec), edge_specs
+        )
 
     edges = pd.concat(
         [persona_edges, tenure_edges, segment_edges],
@@ -298,9 +347,66 @@ def build_kg_edges(
         ignore_index=True,
     )
 
-    # Optional: drop exact duplicates if any
-    edges = edges.drop_duplicates(
-        subset=[kg_schema.src_id, kg_schema.dst_id, kg_schema.edge_type]
-    )
+    # Optional: drop exact duplicates if any. Hash one int64 key built from
+    # the factorized id codes rather than three object columns.
+    src_codes, src_uniques = pd.factorize(edges[kg_schema.src_id], sort=False)
+    dst_codes, dst_uniques = pd.factorize(edges[kg_schema.dst_id], sort=False)
+    type_codes, type_uniques = pd.factorize(edges[kg_schema.edge_type], sort=False)
+    key = (
+        src_codes.astype(np.int64) * len(dst_uniques) + dst_codes
+    ) * len(type_uniques) + type_codes
+    edges = edges[~pd.Index(key).duplicated()]
 
     return edges
+
+
+def build_kg_edges(
+    uplift_df: pd.DataFrame,
+    min_uplift_for_edge: float = 0.0,
+    use_polars: bool = True,
+) -> pd.DataFrame:
+    """
+    Build KG edges from uplift summary:
+    - persona_entity
+    - tenure_entity
+    - segment_entity
+
+    With `use_polars` (and polars installed) the edges are built by a lazy
+    polars query; otherwise with pandas. Both give identical frames.
+    """
+    schema = NbaUpliftSchema()
+    kg_schema = KGEdgeSchema()
+
+    # Only these columns reach the edges; select them before filtering so
+    # the mask slices (and polars converts) nothing else.
+    needed_cols = [
+        schema.persona_id,
+        schema.tenure_bucket,
+        schema.entity_type,
+        schema.entity_id,
+        schema.incremental_renewal_rate,
+        schema.n_test_matched,
+        schema.n_control_matched,
+    ]
+    if min_uplift_for_edge is not None and min_uplift_for_edge > 0:
+        mask = uplift_df[schema.incremental_renewal_rate] >= min_uplift_for_edge
+        df = uplift_df.loc[mask, needed_cols]
+    else:
+        df = uplift_df[needed_cols]
+    df = _categorize(df)
+
+    if use_polars and pl is not None:
+        edges = _build_kg_edges_polars(df)
+    else:
+        edges = _build_kg_edges_pandas(df)
+
+    # Narrow dtypes: edge tables run to millions of rows
+    return edges.astype(
+        {
+            kg_schema.edge_type: pd.CategoricalDtype(EDGE_TYPES),
+            kg_schema.weight: np.float32,
+            kg_schema.support: np.int32,
+            kg_schema.persona_id: np.int32,
+            kg_schema.entity_id: np.int64,
+        }
+    )
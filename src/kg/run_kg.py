@@ -4,7 +4,7 @@ from __future__ import annotations
 from pathlib import Path
 
 from src.common.utils import load_yaml
-from src.common.io import read_df
+from src.common.io import read_df, write_df
 from src.common.logging import setup_logger
 from src.kg.build_graph import build_kg_nodes, build_kg_edges
 
@@ -43,14 +43,19 @@ def main() -> None:
     edges_df = build_kg_edges(uplift_df, min_uplift_for_edge=min_uplift)
     logger.info("KG edges: %d", len(edges_df))
 
-    nodes_path = project_root / kg_cfg["files"]["nodes_csv"]
-    edges_path = project_root / kg_cfg["files"]["edges_csv"]
+    output_format = kg_cfg.get("kg", {}).get("output_format", "parquet")
+    nodes_path = (project_root / kg_cfg["files"]["nodes"]).with_suffix(
+        f".{output_format}"
+    )
+    edges_path = (project_root / kg_cfg["files"]["edges"]).with_suffix(
+        f".{output_format}"
+    )
 
     logger.info("Writing KG nodes to %s", nodes_path)
-    nodes_df.to_csv(nodes_path, index=False)
+    write_df(nodes_df, nodes_path, fmt=output_format)
 
     logger.info("Writing KG edges to %s", edges_path)
-    edges_df.to_csv(edges_path, index=False)
+    write_df(edges_df, edges_path, fmt=output_format)
 
     logger.info("KG build complete.")
 
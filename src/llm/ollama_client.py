@@ -3,13 +3,27 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterator, List
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from src.common.utils import load_yaml
 from src.common.logging import setup_logger
 
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is optional
+    import json
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _json_loads = json.loads
+
 
 class OllamaClient:
     """
@@ -26,6 +40,14 @@ class OllamaClient:
         self.timeout = timeout
         self.logger = setup_logger("ollama_client")
 
+        # One pooled keep-alive session per client, so chat turns reuse the
+        # TCP connection instead of reconnecting on every call.
+        self._session = requests.Session()
+        self._session.headers.update({"Connection": "keep-alive"})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
     @classmethod
     def from_llm_config(cls, project_root: Path) -> "OllamaClient":
         cfg = load_yaml(project_root / "configs" / "llm.yaml")
@@ -47,42 +69,57 @@ class OllamaClient:
 
         return cls(base_url=base_url, model=model, timeout=timeout)
 
-    def chat(self, messages: List[Dict[str, Any]]) -> str:
+    def chat_stream(self, messages: List[Dict[str, Any]]) -> Iterator[str]:
         """
-        Call Ollama's /api/chat endpoint.
+        Call Ollama's /api/chat endpoint with streaming enabled and yield the
+        assistant content pieces as they arrive.
 
-        Returns a plain string. On any error, returns an error message instead
-        of raising, so that the API layer can still respond.
+        Unlike `chat`, errors are raised to the caller.
         """
         url = f"{self.base_url}/api/chat"
         payload: Dict[str, Any] = {
             "model": self.model,
             "messages": messages,
-            "stream": False,
+            "stream": True,
         }
 
-        try:
-            resp = requests.post(url, json=payload, timeout=self.timeout)
+        with self._session.post(
+            url,
+            data=_json_dumps(payload),
+            headers={"Content-Type": "application/json"},
+            stream=True,
+            timeout=self.timeout,
+        ) as resp:
             resp.raise_for_status()
-            data = resp.json()
-
-            # Typical Ollama chat response:
-            # {"message": {"role": "assistant", "content": "..."}, ...}
-            if isinstance(data, dict):
-                msg = data.get("message")
-                if isinstance(msg, dict):
-                    content = msg.get("content", "")
-                    return str(content).strip()
+            # One JSON object per line:
+            # {"message": {"role": "assistant", "content": "..."}, "done": false}
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                if not isinstance(chunk, dict):
+                    continue
+
+                msg = chunk.get("message")
+                if isinstance(msg, dict) and msg.get("content"):
+                    yield str(msg["content"])
+
+                if chunk.get("done"):
+                    break
 
-                # Very defensive fallback, in case structure changes
-                if "choices" in data:
-                    choice0 = data["choices"][0]
-                    content = choice0.get("message", {}).get("content", "")
-                    return str(content).strip()
+    def chat(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        Call Ollama's /api/chat endpoint.
 
-            # Last-resort: just string-ify whatever we got
-            return str(data)
+        The response is streamed and accumulated, so generation and transfer
+        overlap. Returns a plain string. On any error, returns an error
+        message instead of raising, so that the API layer can still respond.
+        """
+        try:
+            return "".join(self.chat_stream(messages)).strip()
 
         except Exception as e:  # noqa: BLE001
-            self.logger.error("Error calling Ollama at %s: %s", url, e)
+            self.logger.error(
+                "Error calling Ollama at %s/api/chat: %s", self.base_url, e
+            )
             return f"Error calling Ollama model: {e}"
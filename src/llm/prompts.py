@@ -1,6 +1,7 @@
 # src/llm/prompts.py
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import List, Dict, Any
 
 
@@ -18,37 +19,62 @@ Rules:
 """
 
 
+# Shared by every message list; treat as read-only.
+_SYSTEM_MSG: dict[str, str] = {"role": "system", "content": SYSTEM_PROMPT}
+
+_FACT_LINE = "[Fact {0}] Persona={1}, Tenure={2}, Entity={3}:{4} -> {5}"
+_RECO_LINE = "[Reco rank={0}] {1}:{2} | uplift≈{3:.0f} bps | {4}"
+
+
+@lru_cache(maxsize=1024)
+def _format_fact_rows(rows: tuple[tuple[Any, ...], ...]) -> str:
+    return "\n".join(
+        _FACT_LINE.format(i, *row) for i, row in enumerate(rows, start=1)
+    )
+
+
+@lru_cache(maxsize=1024)
+def _format_reco_rows(rows: tuple[tuple[Any, ...], ...]) -> str:
+    return "\n".join(
+        _RECO_LINE.format(rank, ent_type, ent_name, rate * 10000.0, short_expl)
+        for rank, ent_type, ent_name, rate, short_expl in rows
+    )
+
+
 def _format_facts_for_prompt(facts: list[dict[str, Any]]) -> str:
     if not facts:
         return "No retrieved facts."
-    lines = []
-    for i, f in enumerate(facts, start=1):
-        txt = f.get("text") or ""
-        persona = f.get("persona_id", "")
-        tenure = f.get("tenure_bucket", "")
-        entity_type = f.get("entity_type", "")
-        entity_name = f.get("entity_name", "")
-        lines.append(
-            f"[Fact {i}] Persona={persona}, Tenure={tenure}, "
-            f"Entity={entity_type}:{entity_name} -> {txt}"
+    # Only the fields that reach the prompt go into the (hashable) cache key,
+    # so repeated questions over the same facts reuse the formatted block.
+    return _format_fact_rows(
+        tuple(
+            (
+                f.get("persona_id", ""),
+                f.get("tenure_bucket", ""),
+                f.get("entity_type", ""),
+                f.get("entity_name", ""),
+                f.get("text") or "",
+            )
+            for f in facts
         )
-    return "\n".join(lines)
+    )
 
 
 def _format_recos_for_prompt(recos: list[dict[str, Any]]) -> str:
     if not recos:
         return "No precomputed member recommendations."
-    lines = []
-    for r in recos:
-        ent_type = r.get("entity_type")
-        ent_name = r.get("entity_name")
-        uplift = r.get("incremental_renewal_rate", 0.0) * 10000.0
-        rank = r.get("member_rank")
-        short_expl = r.get("explanation_short", "")
-        lines.append(
-            f"[Reco rank={rank}] {ent_type}:{ent_name} | uplift≈{uplift:.0f} bps | {short_expl}"
+    return _format_reco_rows(
+        tuple(
+            (
+                r.get("member_rank"),
+                r.get("entity_type"),
+                r.get("entity_name"),
+                r.get("incremental_renewal_rate", 0.0),
+                r.get("explanation_short", ""),
+            )
+            for r in recos
         )
-    return "\n".join(lines)
+    )
 
 
 def build_member_nba_messages(
@@ -71,7 +97,7 @@ def build_member_nba_messages(
     )
 
     return [
-        {"role": "system", "content": SYSTEM_PROMPT},
+        _SYSTEM_MSG,
         {"role": "user", "content": user_content},
     ]
 
@@ -92,7 +118,7 @@ def build_segment_analysis_messages(
     )
 
     return [
-        {"role": "system", "content": SYSTEM_PROMPT},
+        _SYSTEM_MSG,
         {"role": "user", "content": user_content},
     ]
 
@@ -117,7 +143,7 @@ def build_why_explanation_messages(
     )
 
     return [
-        {"role": "system", "content": SYSTEM_PROMPT},
+        _SYSTEM_MSG,
         {"role": "user", "content": user_content},
     ]
 
@@ -138,7 +164,7 @@ def build_kg_explore_messages(
     )
 
     return [
-        {"role": "system", "content": SYSTEM_PROMPT},
+        _SYSTEM_MSG,
         {"role": "user", "content": user_content},
     ]
 
@@ -160,6 +186,6 @@ def build_general_help_messages(
     )
 
     return [
-        {"role": "system", "content": SYSTEM_PROMPT},
+        _SYSTEM_MSG,
         {"role": "user", "content": user_content},
     ]
@@ -0,0 +1,93 @@
+# src/llm/response_cache.py
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Tuple
+
+import faiss
+import numpy as np
+
+
+class SemanticResponseCache:
+    """
+    In-process cache of LLM answers for paraphrased questions.
+
+    Entries are grouped by an exact `scope` (e.g. `(intent, membership_nbr)`),
+    so an answer about one member is never served for another; within a scope,
+    a query hits when the inner product of its (L2-normalized) embedding with
+    a cached query's embedding reaches `threshold`.
+
+    The cache holds at most `max_entries` answers. A scope keeps its newest
+    `max_entries_per_scope` answers, and once the cache is full the least
+    recently used scopes are evicted whole, so one busy scope or a burst of
+    new questions never wipes the rest of the warm set.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 1024,
+        max_entries_per_scope: int = 64,
+    ) -> None:
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_entries_per_scope = max(1, min(max_entries_per_scope, max_entries))
+        self._lock = threading.Lock()
+        # Least recently used scope first
+        self._scopes: OrderedDict[Hashable, Tuple[faiss.IndexFlatIP, List[str]]] = (
+            OrderedDict()
+        )
+        self._size = 0
+        self._version: Hashable = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def sync_version(self, version: Hashable) -> None:
+        """Drop every entry when `version` (of the data behind the answers) changes."""
+        with self._lock:
+            if version != self._version:
+                self._scopes.clear()
+                self._size = 0
+                self._version = version
+
+    def lookup(self, scope: Hashable, q_emb: np.ndarray) -> str | None:
+        """Return the cached answer closest to `q_emb` in `scope`, if close enough."""
+        q_emb = np.asarray(q_emb, dtype="float32").reshape(1, -1)
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None:
+                return None
+            self._scopes.move_to_end(scope)
+            index, answers = entry
+            scores, idxs = index.search(q_emb, 1)
+
+        if idxs[0, 0] < 0 or scores[0, 0] < self.threshold:
+            return None
+        return answers[idxs[0, 0]]
+
+    def insert(self, scope: Hashable, q_emb: np.ndarray, answer: str) -> None:
+        q_emb = np.asarray(q_emb, dtype="float32").reshape(1, -1)
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None:
+                entry = (faiss.IndexFlatIP(q_emb.shape[1]), [])
+                self._scopes[scope] = entry
+            else:
+                self._scopes.move_to_end(scope)
+            index, answers = entry
+
+            if len(answers) >= self.max_entries_per_scope:
+                # Drop the scope's oldest answer; remove_ids renumbers the
+                # remaining vectors, which keeps them aligned with `answers`.
+                index.remove_ids(np.array([0], dtype="int64"))
+                answers.pop(0)
+                self._size -= 1
+            index.add(q_emb)
+            answers.append(answer)
+            self._size += 1
+
+            while self._size > self.max_entries:
+                _, (_, evicted) = self._scopes.popitem(last=False)
+                self._size -= len(evicted)
@@ -2,10 +2,15 @@
 from __future__ import annotations
 
 import os
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 
-import pandas as pd
+import numpy as np
+import pyarrow as pa
 import pyarrow.parquet as pq
 
 from src.common.utils import load_yaml
@@ -15,6 +20,7 @@ from src.common.logging import setup_logger
 
 from src.retrieval.vector_store import VectorStore, VectorStoreConfig
 from src.llm.ollama_client import OllamaClient
+from src.llm.response_cache import SemanticResponseCache
 from src.llm import prompts
 
 
@@ -95,6 +101,48 @@ def _detect_intent(user_query: str, intents: list[str]) -> str:
 #         logger.error("Failed to load member recos for %s: %s", membership_nbr, e)
 #         return []
 
+
+# Intents whose answer depends on the member's own recos
+_MEMBER_INTENTS = ("member_nba", "why_explanation")
+
+# Query tokens that pin an answer to a segment: anything with a digit
+# (persona ids, tenure buckets like "0-3m" / "3y+", member numbers) plus
+# tenure words. Paraphrases embed alike even when these differ, so they are
+# part of the response-cache scope.
+_SEGMENT_TOKEN_RE = re.compile(
+    r"\d[\w.+-]*|\b(?:first|second|third|new|early|tenured|long-tenured|veteran)\b"
+)
+
+
+def _cache_scope(
+    intent: str,
+    user_query: str,
+    membership_nbr: Optional[int],
+) -> Tuple[str, Optional[str], Tuple[str, ...]]:
+    """
+    Response-cache scope: the intent, the member for member intents, and
+    the segment tokens of the query (order-insensitive), so "why do 0-3m
+    members churn" never reuses the answer to "why do 3y+ members churn".
+    """
+    segment = tuple(sorted(set(_SEGMENT_TOKEN_RE.findall(user_query.lower()))))
+    member = str(membership_nbr) if intent in _MEMBER_INTENTS else None
+    return (intent, member, segment)
+
+
+# Reco columns that reach the LLM prompt (besides the membership key)
+_RECO_PROMPT_COLS = (
+    "engagement_bucket",
+    "churn_risk_flag",
+    "entity_type",
+    "entity_id",
+    "entity_name",
+    "incremental_renewal_rate",
+    "score",
+    "member_rank",
+    "explanation_short",
+)
+
+
 def _load_member_recos_for_member(
     project_root: Path,
     membership_nbr: Optional[int],
@@ -103,8 +151,9 @@ def _load_member_recos_for_member(
     Load recommendation rows only for a single member.
 
     Strategy:
-    - Try a parquet-level filter via pyarrow (efficient).
-    - If that returns 0 rows, fall back to pandas filtering.
+    - Coerce the id to the file's membership_nbr type and filter via pyarrow,
+      so only matching row groups and prompt columns are decoded.
+    - A miss returns [] without scanning the rest of the file.
     - Always cap rows to a small number for LLM context.
     """
     if membership_nbr is None:
@@ -123,54 +172,43 @@ def _load_member_recos_for_member(
     membership_col = m_schema.membership_nbr  # should be "membership_nbr"
 
     try:
-        # First try: pyarrow filter (efficient)
-        table = pq.read_table(
-            reco_path,
-            filters=[(membership_col, "==", membership_nbr)],
-        )
-
-        if table.num_rows > 0:
-            df = table.to_pandas()
-            logger.info(
-                "Loaded %d member recos via pyarrow filter for %s",
-                len(df),
-                membership_nbr,
-            )
-        else:
-            # Fallback: load full parquet and filter with pandas
-            logger.info(
-                "No rows via pyarrow filter for %s; falling back to pandas filter",
-                membership_nbr,
-            )
-            df_full = pd.read_parquet(reco_path)
-            # Handle possible type mismatch (str vs int)
-            df = df_full[
-                df_full[membership_col].astype(str) == str(membership_nbr)
-            ].copy()
+        # Only decode the columns the prompt uses
+        file_schema = pq.ParquetFile(reco_path).schema_arrow
+        present = set(file_schema.names)
+        columns = [c for c in (membership_col, *_RECO_PROMPT_COLS) if c in present]
+
+        # The reco writer stores membership_nbr with a single canonical dtype,
+        # so coerce the query value to match and let the filter prune row groups.
+        key_type = file_schema.field(membership_col).type
+        try:
+            if pa.types.is_integer(key_type):
+                key = int(membership_nbr)
+            else:
+                key = str(membership_nbr)
+        except ValueError:
             logger.info(
-                "Loaded %d member recos via pandas filter for %s",
-                len(df),
+                "Membership id %r does not match reco key type %s",
                 membership_nbr,
+                key_type,
             )
+            return []
+
+        table = pq.read_table(
+            reco_path,
+            columns=columns,
+            filters=[(membership_col, "==", key)],
+            use_threads=True,
+        )
+        df = table.to_pandas()
+        logger.info(
+            "Loaded %d member recos via pyarrow filter for %s",
+            len(df),
+            membership_nbr,
+        )
 
         if df.empty:
             return []
 
-        # Optional: limit to columns we actually care about in the prompt
-        cols_to_keep = [
-            membership_col,
-            "engagement_bucket",
-            "churn_risk_flag",
-            "entity_type",
-            "entity_id",
-            "entity_name",
-            "incremental_renewal_rate",
-            "score",
-            "member_rank",
-            "explanation_short",
-        ]
-        df = df[[c for c in cols_to_keep if c in df.columns]]
-
         # Cap rows for LLM
         MAX_RECS = 50
         records = df.to_dict(orient="records")[:MAX_RECS]
@@ -188,7 +226,13 @@ def _load_member_recos_for_member(
 
 
 
+# Serializes first loads so concurrent requests don't each build a store
+_VECTOR_STORE_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=4)
 def _load_vector_store(project_root: Path) -> VectorStore:
+    """Load the FAISS index, metadata and embedding model once per project root."""
     app_cfg = load_yaml(project_root / "configs" / "app.yaml")
     llm_cfg = load_yaml(project_root / "configs" / "llm.yaml")
 
@@ -200,18 +244,78 @@ def _load_vector_store(project_root: Path) -> VectorStore:
         index_file=emb_cfg.get("index_file", "faiss_index.bin"),
         meta_file=emb_cfg.get("meta_file", "metadata.parquet"),
         normalize=bool(emb_cfg.get("normalize", True)),
+        index_factory=emb_cfg.get("index_factory", "Flat"),
+        nprobe=int(emb_cfg.get("nprobe", 16)),
+        ef_search=int(emb_cfg.get("ef_search", 64)),
+        encode_batch_size=int(emb_cfg.get("encode_batch_size", 64)),
+        num_threads=int(emb_cfg.get("num_threads", 0)),
+        faiss_threads=int(emb_cfg.get("faiss_threads", 0)),
+        encoder_backend=emb_cfg.get("encoder_backend", "torch"),
     )
     store = VectorStore(cfg=vs_cfg, base_dir=retrieval_dir)
     store.load()
     return store
 
 
+def _get_vector_store(project_root: Path) -> VectorStore:
+    with _VECTOR_STORE_LOCK:
+        return _load_vector_store(project_root)
+
+
+@lru_cache(maxsize=4)
+def _get_response_cache(project_root: Path) -> Optional[SemanticResponseCache]:
+    """Build the answer cache from llm.yaml; None when it is disabled."""
+    llm_cfg = load_yaml(project_root / "configs" / "llm.yaml")
+    cache_cfg = llm_cfg.get("response_cache", {})
+    if not cache_cfg.get("enabled", False):
+        return None
+    return SemanticResponseCache(
+        threshold=float(cache_cfg.get("similarity_threshold", 0.95)),
+        max_entries=int(cache_cfg.get("max_entries", 1024)),
+        max_entries_per_scope=int(cache_cfg.get("max_entries_per_scope", 64)),
+    )
+
+
+def _artifact_version(
+    project_root: Path, llm_cfg: Dict[str, Any]
+) -> Tuple[Optional[int], ...]:
+    """
+    mtimes of the member recos and the vector index / metadata. Cached
+    answers are only valid for the build they were generated from.
+    """
+    app_cfg = load_yaml(project_root / "configs" / "app.yaml")
+    retrieval_dir = project_root / app_cfg["paths"]["retrieval_dir"]
+    emb_cfg = llm_cfg.get("embedding", {})
+    paths = (
+        project_root / app_cfg["paths"]["outputs_dir"] / "member_nba_recos.parquet",
+        retrieval_dir / emb_cfg.get("index_file", "faiss_index.bin"),
+        retrieval_dir / emb_cfg.get("meta_file", "metadata.parquet"),
+    )
+    version = []
+    for path in paths:
+        try:
+            version.append(path.stat().st_mtime_ns)
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+
+@lru_cache(maxsize=4)
+def _get_llm_client(project_root: Path) -> OllamaClient:
+    """Build the LLM client once per project root and reuse it across queries."""
+    return OllamaClient.from_llm_config(project_root=project_root)
+
+
 def _search_facts(
     store: VectorStore,
-    query: str,
+    queries: List[str],
     top_k: int = 10,
-) -> List[Dict[str, Any]]:
-    return store.search(query=query, top_k=top_k)
+    query_embeddings: Optional[np.ndarray] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Retrieve facts for all `queries` in one batched index search."""
+    return store.search_batch(
+        queries, top_k=top_k, query_embeddings=query_embeddings
+    )
 
 
 def _fallback_no_llm_answer(
@@ -231,18 +335,28 @@ def _fallback_no_llm_answer(
     return "\n".join(lines)
 
 
-def answer_query(
-    user_query: str,
-    membership_nbr: Optional[int] = None,
-    project_root: Optional[Path] = None,
-) -> Dict[str, Any]:
-    """
-    High-level router used by the API.
-    This version is heavily instrumented for debugging.
-    """
-    if project_root is None:
-        project_root = Path(__file__).resolve().parents[2]
+@dataclass
+class _PreparedQuery:
+    """Everything `answer_query` / `answer_query_stream` need before the LLM."""
+
+    intent: str
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    member_recos: List[Dict[str, Any]] = field(default_factory=list)
+    retrieved_facts: List[Dict[str, Any]] = field(default_factory=list)
+    cache_scope: Optional[Tuple[str, Optional[str], Tuple[str, ...]]] = None
+    query_emb: Optional[np.ndarray] = None
+    response_cache: Optional[SemanticResponseCache] = None
+    # Set when no LLM call is needed (debug echo, config error, cache hit,
+    # RI_DISABLE_OLLAMA fallback)
+    answer: Optional[str] = None
+
 
+def _prepare_answer(
+    user_query: str,
+    membership_nbr: Optional[int],
+    project_root: Path,
+) -> _PreparedQuery:
+    """Intent detection, response cache, member recos, retrieval and prompt."""
     logger = setup_logger("llm_router", log_dir=project_root / "data" / "logs")
 
     logger.info("answer_query start, member=%s", membership_nbr)
@@ -263,22 +377,19 @@ def answer_query(
 
     if debug_echo:
         logger.info("Short-circuiting with DEBUG_ECHO")
-        return {
-            "answer": f"[DEBUG ECHO] You asked: {user_query} (member={membership_nbr})",
-            "intent": "debug_echo",
-            "used_member_nbr": membership_nbr,
-        }
+        return _PreparedQuery(
+            intent="debug_echo",
+            answer=f"[DEBUG ECHO] You asked: {user_query} (member={membership_nbr})",
+        )
 
     # Load LLM config (with guard)
     try:
         llm_cfg = load_yaml(project_root / "configs" / "llm.yaml")
     except Exception as e:
         logger.exception("Failed to load llm.yaml: %s", e)
-        return {
-            "answer": f"Error loading LLM config: {e}",
-            "intent": "config_error",
-            "used_member_nbr": membership_nbr,
-        }
+        return _PreparedQuery(
+            intent="config_error", answer=f"Error loading LLM config: {e}"
+        )
 
     intents = llm_cfg.get("routing", {}).get("intents", [])
     if not intents:
@@ -287,9 +398,35 @@ def answer_query(
     intent = _detect_intent(user_query, intents)
     logger.info("Detected intent: %s", intent)
 
+    # ---------- Response cache ----------
+    # Paraphrases of an earlier question (same intent, same segment tokens,
+    # and same member for member intents) reuse its answer instead of
+    # calling the LLM again. Only answers built from the full pipeline are
+    # cached, so any disable flag bypasses it (and never loads the store).
+    response_cache = None
+    if not (disable_ollama or disable_retrieval or disable_member_recos):
+        response_cache = _get_response_cache(project_root)
+    cache_scope = _cache_scope(intent, user_query, membership_nbr)
+    query_emb = None
+    if response_cache is not None:
+        try:
+            # A reco / index rebuild invalidates every cached answer
+            response_cache.sync_version(_artifact_version(project_root, llm_cfg))
+            store = _get_vector_store(project_root)
+            # Same text the retrieval step searches with, so it can reuse this
+            query_emb = store.encode_queries([user_query])[0]
+            cached_answer = response_cache.lookup(cache_scope, query_emb)
+        except Exception as e:
+            logger.warning("Response cache unavailable: %s", e)
+            cached_answer = None
+
+        if cached_answer is not None:
+            logger.info("Response cache hit for intent=%s", intent)
+            return _PreparedQuery(intent=intent, answer=cached_answer)
+
     # ---------- Member recos (TEMPORARILY OPTIONAL) ----------
     member_recos: List[Dict[str, Any]] = []
-    if membership_nbr is not None and intent in ("member_nba", "why_explanation"):
+    if membership_nbr is not None and intent in _MEMBER_INTENTS:
         if disable_member_recos:
             logger.info("Skipping member recos load (RI_DISABLE_MEMBER_RECOS=1)")
         else:
@@ -307,9 +444,14 @@ def answer_query(
         logger.info("Retrieval disabled via RI_DISABLE_RETRIEVAL")
     else:
         try:
-            logger.info("Loading vector store and searching facts")
-            store = _load_vector_store(project_root)
-            retrieved_facts = _search_facts(store, user_query, top_k=10)
+            logger.info("Searching facts")
+            store = _get_vector_store(project_root)
+            (retrieved_facts,) = _search_facts(
+                store,
+                [user_query],
+                top_k=10,
+                query_embeddings=None if query_emb is None else query_emb[None, :],
+            )
             logger.info("Retrieved %d facts", len(retrieved_facts))
         except Exception as e:
             logger.exception("Retrieval failed: %s", e)
@@ -347,32 +489,121 @@ def answer_query(
 
     logger.info("Messages built; count=%d", len(msgs))
 
-    # ---------- LLM call or fallback ----------
+    prepared = _PreparedQuery(
+        intent=intent,
+        messages=msgs,
+        member_recos=member_recos,
+        retrieved_facts=retrieved_facts,
+        cache_scope=cache_scope,
+        query_emb=query_emb,
+        response_cache=response_cache,
+    )
     if disable_ollama:
         logger.info("RI_DISABLE_OLLAMA=1, using fallback answer")
-        answer_text = _fallback_no_llm_answer(
+        prepared.answer = _fallback_no_llm_answer(
             user_query=user_query,
             intent=intent,
             member_recos=member_recos,
             retrieved_facts=retrieved_facts,
         )
-    else:
+    return prepared
+
+
+def _cache_answer(prepared: _PreparedQuery, answer_text: str) -> None:
+    # chat() reports failures as text; only cache real answers
+    if prepared.query_emb is not None and not answer_text.startswith(
+        "Error calling Ollama"
+    ):
+        prepared.response_cache.insert(
+            prepared.cache_scope, prepared.query_emb, answer_text
+        )
+
+
+def answer_query(
+    user_query: str,
+    membership_nbr: Optional[int] = None,
+    project_root: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    High-level router used by the API.
+    This version is heavily instrumented for debugging.
+    """
+    if project_root is None:
+        project_root = Path(__file__).resolve().parents[2]
+
+    logger = setup_logger("llm_router", log_dir=project_root / "data" / "logs")
+    prepared = _prepare_answer(user_query, membership_nbr, project_root)
+
+    # ---------- LLM call or fallback ----------
+    answer_text = prepared.answer
+    if answer_text is None:
         logger.info("Calling Ollama client.chat()")
         try:
-            client = OllamaClient.from_llm_config(project_root=project_root)
-            answer_text = client.chat(messages=msgs)
+            client = _get_llm_client(project_root)
+            answer_text = client.chat(messages=prepared.messages)
+            _cache_answer(prepared, answer_text)
         except Exception as e:
             logger.exception("Ollama call failed: %s", e)
             answer_text = _fallback_no_llm_answer(
                 user_query=user_query,
-                intent=intent,
-                member_recos=member_recos,
-                retrieved_facts=retrieved_facts,
+                intent=prepared.intent,
+                member_recos=prepared.member_recos,
+                retrieved_facts=prepared.retrieved_facts,
             )
 
     logger.info("answer_query finished normally")
     return {
         "answer": answer_text,
-        "intent": intent,
+        "intent": prepared.intent,
         "used_member_nbr": membership_nbr,
     }
+
+
+def answer_query_stream(
+    user_query: str,
+    membership_nbr: Optional[int] = None,
+    project_root: Optional[Path] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of `answer_query`. Yields events:
+
+    - {"event": "meta", "intent": ..., "membership_nbr": ...} first,
+    - {"event": "delta", "content": ...} as LLM tokens arrive,
+    - {"event": "done", "answer": <full answer>} last.
+    """
+    if project_root is None:
+        project_root = Path(__file__).resolve().parents[2]
+
+    logger = setup_logger("llm_router", log_dir=project_root / "data" / "logs")
+    prepared = _prepare_answer(user_query, membership_nbr, project_root)
+    yield {
+        "event": "meta",
+        "intent": prepared.intent,
+        "membership_nbr": membership_nbr,
+    }
+
+    if prepared.answer is not None:
+        yield {"event": "delta", "content": prepared.answer}
+        yield {"event": "done", "answer": prepared.answer}
+        return
+
+    logger.info("Calling Ollama client.chat_stream()")
+    pieces: List[str] = []
+    try:
+        client = _get_llm_client(project_root)
+        for piece in client.chat_stream(messages=prepared.messages):
+            pieces.append(piece)
+            yield {"event": "delta", "content": piece}
+        answer_text = "".join(pieces).strip()
+        _cache_answer(prepared, answer_text)
+    except Exception as e:
+        # Same text chat() would have returned; appended to any partial answer
+        logger.error("Error streaming from Ollama: %s", e)
+        error_text = f"Error calling Ollama model: {e}"
+        if pieces:
+            error_text = "\n\n" + error_text
+        yield {"event": "delta", "content": error_text}
+        answer_text = ("".join(pieces) + error_text).strip()
+
+    logger.info("answer_query_stream finished normally")
+    yield {"event": "done", "answer": answer_text}
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from typing import Dict, Any
 
+import numpy as np
 import pandas as pd
 
 from src.common.schema import MembersSchema, NbaUpliftSchema
@@ -28,47 +29,36 @@ def _select_top_entities_per_segment(
         ascending=[True, True, False],
     )
 
-    # Rank within segment and keep top N
-    df["segment_rank"] = (
-        df.groupby([u_schema.persona_id, u_schema.tenure_bucket])[
-            u_schema.incremental_renewal_rate
-        ]
-        .rank(method="first", ascending=False)
-        .astype(int)
+    # Rows are already in uplift order within each segment, so keep the
+    # first N and number them
+    segment_keys = [u_schema.persona_id, u_schema.tenure_bucket]
+    df = df.groupby(segment_keys, sort=False, observed=True).head(
+        max_candidates_per_segment
     )
-
-    df = df[df["segment_rank"] <= max_candidates_per_segment]
+    df["segment_rank"] = (
+        df.groupby(segment_keys, sort=False, observed=True).cumcount() + 1
+    ).astype(np.int32)
 
     return df
 
 
-def generate_member_candidates(
-    member_features_df: pd.DataFrame,
+def _segment_candidates(
     uplift_df: pd.DataFrame,
     reco_cfg: Dict[str, Any],
 ) -> pd.DataFrame:
-    """
-    Generate member-level candidate NBAs:
-
-    1. For each (persona_id, tenure_bucket), pick top entities by uplift.
-    2. Join those entities onto all members in that segment.
-
-    Returns a DataFrame with one row per (member, entity candidate).
-    """
-    m_schema = MembersSchema()
+    """Top entities per (persona_id, tenure_bucket), trimmed to downstream columns."""
     u_schema = NbaUpliftSchema()
 
     max_candidates_per_segment = int(
         reco_cfg.get("max_candidates_per_segment", 20)
     )
 
-    # 1) segment-level top entities
     segment_top = _select_top_entities_per_segment(
         uplift_df, max_candidates_per_segment=max_candidates_per_segment
     )
 
     # Keep only columns needed downstream
-    segment_top = segment_top[
+    return segment_top[
         [
             u_schema.persona_id,
             u_schema.tenure_bucket,
@@ -84,22 +74,86 @@ def generate_member_candidates(
         ]
     ]
 
-    # 2) Join with members on (persona_id, tenure_bucket)
-    # This assigns the segment's candidate entities to each member.
-    merged = member_features_df.merge(
+
+def _join_members(
+    member_features_df: pd.DataFrame,
+    segment_top: pd.DataFrame,
+) -> pd.DataFrame:
+    """Assign each segment's candidate entities to every member in it."""
+    m_schema = MembersSchema()
+    u_schema = NbaUpliftSchema()
+
+    # Join with members on (persona_id, tenure_bucket). With both sides
+    # using the members' key names, the keys come out once and stay in the
+    # result for ranking and explanations.
+    segment_keys = [m_schema.persona_id, m_schema.tenure_bucket]
+    segment_top = segment_top.rename(
+        columns={
+            u_schema.persona_id: m_schema.persona_id,
+            u_schema.tenure_bucket: m_schema.tenure_bucket,
+        }
+    )
+    return member_features_df.merge(
         segment_top,
         how="left",
-        left_on=[m_schema.persona_id, m_schema.tenure_bucket],
-        right_on=[u_schema.persona_id, u_schema.tenure_bucket],
+        on=segment_keys,
         suffixes=("", "_uplift"),
+        sort=False,
     )
 
-    # Drop duplicated join keys from uplift side
-    merged = merged.drop(
-        columns=[
-            u_schema.persona_id,
-            u_schema.tenure_bucket,
-        ]
+
+def generate_member_candidates(
+    member_features_df: pd.DataFrame,
+    uplift_df: pd.DataFrame,
+    reco_cfg: Dict[str, Any],
+) -> pd.DataFrame:
+    """
+    Generate member-level candidate NBAs:
+
+    1. For each (persona_id, tenure_bucket), pick top entities by uplift.
+    2. Join those entities onto all members in that segment.
+
+    Returns a DataFrame with one row per (member, entity candidate).
+    """
+    segment_top = _segment_candidates(uplift_df, reco_cfg)
+    return _join_members(member_features_df, segment_top)
+
+
+def generate_top_member_candidates(
+    member_features_df: pd.DataFrame,
+    uplift_df: pd.DataFrame,
+    reco_cfg: Dict[str, Any],
+) -> tuple[pd.DataFrame, tuple[float, float]]:
+    """
+    Like `generate_member_candidates`, but only join each segment's top
+    `top_k_recos` entities onto its members.
+
+    A member's score only varies across candidates through the segment's
+    uplift term (engagement and risk are per member), so its top-K by score
+    are its segment's top-K by uplift. Pruning before the join skips
+    materializing the other candidates.
+
+    Also returns the (min, max) uplift in bps over the full candidate set,
+    which `score_candidates` needs to normalize uplift exactly as it would
+    on the unpruned candidates.
+    """
+    m_schema = MembersSchema()
+    u_schema = NbaUpliftSchema()
+
+    top_k = int(reco_cfg.get("top_k_recos", 5))
+    segment_top = _segment_candidates(uplift_df, reco_cfg)
+
+    # Uplift range over the segments that actually have members
+    present = member_features_df[
+        [m_schema.persona_id, m_schema.tenure_bucket]
+    ].drop_duplicates()
+    used = segment_top.merge(
+        present,
+        left_on=[u_schema.persona_id, u_schema.tenure_bucket],
+        right_on=[m_schema.persona_id, m_schema.tenure_bucket],
     )
+    uplift_bps = used[u_schema.incremental_renewal_rate] * 10000.0
+    uplift_range = (uplift_bps.min(), uplift_bps.max())
 
-    return merged
+    segment_top = segment_top[segment_top["segment_rank"] <= top_k]
+    return _join_members(member_features_df, segment_top), uplift_range
@@ -1,84 +1,168 @@
 # src/reco/explanations.py
 from __future__ import annotations
 
+from typing import Any
+
+import numpy as np
 import pandas as pd
 
 from src.common.schema import MembersSchema, NbaUpliftSchema
 
 
+# Rows formatted per pass. Each pass holds a few temporary string arrays,
+# so this bounds peak memory on multi-million-row reco tables.
+_CHUNK_ROWS = 100_000
+
+
+def _explain_block(
+    df: pd.DataFrame,
+    persona_col: str | None,
+    tenure_col: str | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Short and long explanation strings for every row of `df`."""
+    u_schema = NbaUpliftSchema()
+
+    n = len(df)
+
+    def _col(name: str | None) -> pd.Series | None:
+        return df[name] if name is not None and name in df.columns else None
+
+    def _fmt(fmt: str, values: pd.Series) -> np.ndarray:
+        # printf-style formatting of a whole float column at once
+        return np.char.mod(fmt, values.to_numpy(dtype=float)).astype(object)
+
+    def _when(mask: pd.Series | bool, text: Any) -> np.ndarray:
+        return np.where(mask, text, "").astype(object)
+
+    uplift = _col(u_schema.incremental_renewal_rate)
+    uplift_bps = _fmt(
+        "%.0f", uplift * 10000.0 if uplift is not None else pd.Series(np.zeros(n))
+    )
+    ent = _col(u_schema.entity_name)
+    ent_name = (
+        ent.fillna("this action").astype(str).to_numpy(dtype=object)
+        if ent is not None
+        else np.full(n, "this action", dtype=object)
+    )
+
+    # Short: "<entity> shows a +N bps uplift[; for Persona P, T members]"
+    short = ent_name + " shows a +" + uplift_bps + " bps uplift"
+    p, t = _col(persona_col), _col(tenure_col)
+    if p is not None and t is not None:
+        short = short + _when(
+            (p.notna() & t.notna()).to_numpy(),
+            "; for Persona "
+            + p.astype(str).to_numpy(dtype=object)
+            + ", "
+            + t.astype(str).to_numpy(dtype=object)
+            + " members",
+        )
+
+    # Long: fixed lead sentence plus optional rate / engagement / risk pieces
+    long = (
+        "This recommendation suggests focusing on '"
+        + ent_name
+        + "' because it is associated with an estimated renewal uplift of about "
+        + uplift_bps
+        + " basis points for similar members."
+    )
+
+    test_rate = _col(u_schema.test_renewal_rate)
+    control_rate = _col(u_schema.control_renewal_rate)
+    if test_rate is not None and control_rate is not None:
+        long = long + _when(
+            (test_rate.notna() & control_rate.notna()).to_numpy(),
+            " In the synthetic-control analysis, the renewal rate for members exposed to "
+            "this action was "
+            + _fmt("%.1f%%", test_rate * 100.0)
+            + " compared to "
+            + _fmt("%.1f%%", control_rate * 100.0)
+            + " for comparable controls.",
+        )
+
+    engagement = _col("engagement_bucket")
+    if engagement is not None:
+        long = long + _when(
+            engagement.notna().to_numpy(),
+            " The member is currently in the '"
+            + engagement.astype(str).to_numpy(dtype=object)
+            + "' engagement bucket, so this action is positioned as an appropriate "
+            "step to influence renewal.",
+        )
+
+    risk = _col("churn_risk_flag")
+    if risk is not None:
+        high_risk = risk.fillna(0).astype(int).to_numpy() == 1
+        long = long + _when(
+            risk.notna().to_numpy(),
+            np.where(
+                high_risk,
+                " The member is flagged as higher churn risk, so interventions with "
+                "strong uplift are prioritized.",
+                " The member is not flagged as high churn risk, but this action still "
+                "shows a meaningful positive uplift.",
+            ),
+        )
+
+    return short, long
+
+
 def add_explanations(ranked_df: pd.DataFrame) -> pd.DataFrame:
     """
     Add short and long explanation strings for each recommendation row.
 
-    These will later be used by the chatbot / LLM layer.
+    These will later be used by the chatbot / LLM layer. The columns are
+    added to `ranked_df` in place, and the same frame is returned.
     """
     m_schema = MembersSchema()
     u_schema = NbaUpliftSchema()
 
-    df = ranked_df.copy()
+    df = ranked_df
 
     # Safely access columns with defaults if missing
     persona_col = m_schema.persona_id if m_schema.persona_id in df.columns else None
     tenure_col = m_schema.tenure_bucket if m_schema.tenure_bucket in df.columns else None
 
-    def short_expl(row) -> str:
-        uplift_bps = row.get(u_schema.incremental_renewal_rate, 0.0) * 10000.0
-        ent_name = row.get(u_schema.entity_name, "this action")
-        p = row.get(persona_col, None)
-        t = row.get(tenure_col, None)
-
-        parts = []
-        parts.append(f"{ent_name} shows a +{uplift_bps:.0f} bps uplift")
-
-        if p is not None and t is not None:
-            parts.append(f"for Persona {p}, {t} members")
-
-        return "; ".join(parts)
-
-    def long_expl(row) -> str:
-        ent_name = row.get(u_schema.entity_name, "this action")
-        uplift = row.get(u_schema.incremental_renewal_rate, 0.0)
-        uplift_bps = uplift * 10000.0
-        test_rate = row.get(u_schema.test_renewal_rate, None)
-        control_rate = row.get(u_schema.control_renewal_rate, None)
-        engagement = row.get("engagement_bucket", None)
-        risk = row.get("churn_risk_flag", None)
-
-        pieces = []
-
-        pieces.append(
-            f"This recommendation suggests focusing on '{ent_name}' because it is associated "
-            f"with an estimated renewal uplift of about {uplift_bps:.0f} basis points for "
-            f"similar members."
+    # The strings depend only on these columns, and members of a segment
+    # share them for each recommended entity: build each distinct
+    # explanation once, then gather it back onto every row.
+    key_cols = [
+        c
+        for c in (
+            u_schema.entity_name,
+            u_schema.incremental_renewal_rate,
+            u_schema.test_renewal_rate,
+            u_schema.control_renewal_rate,
+            persona_col,
+            tenure_col,
+            "engagement_bucket",
+            "churn_risk_flag",
+        )
+        if c is not None and c in df.columns
+    ]
+    if key_cols:
+        codes = (
+            df.groupby(key_cols, sort=False, dropna=False, observed=True)
+            .ngroup()
+            .to_numpy()
+        )
+    else:
+        codes = np.zeros(len(df), dtype=np.intp)
+    # Group numbers follow first appearance, so this is each key's first row
+    _, first_rows = np.unique(codes, return_index=True)
+    unique_df = df.iloc[first_rows]
+
+    n = len(unique_df)
+    short = np.empty(n, dtype=object)
+    long = np.empty(n, dtype=object)
+    for start in range(0, n, _CHUNK_ROWS):
+        stop = start + _CHUNK_ROWS
+        short[start:stop], long[start:stop] = _explain_block(
+            unique_df.iloc[start:stop], persona_col, tenure_col
         )
+    short, long = short[codes], long[codes]
 
-        if (test_rate is not None) and (control_rate is not None):
-            pieces.append(
-                f"In the synthetic-control analysis, the renewal rate for members exposed to this "
-                f"action was {test_rate:.1%} compared to {control_rate:.1%} for comparable controls."
-            )
-
-        if engagement is not None:
-            pieces.append(
-                f"The member is currently in the '{engagement}' engagement bucket, so this "
-                f"action is positioned as an appropriate step to influence renewal."
-            )
-
-        if risk is not None:
-            if int(risk) == 1:
-                pieces.append(
-                    "The member is flagged as higher churn risk, so interventions with strong "
-                    "uplift are prioritized."
-                )
-            else:
-                pieces.append(
-                    "The member is not flagged as high churn risk, but this action still shows a "
-                    "meaningful positive uplift."
-                )
-
-        return " ".join(pieces)
-
-    df["explanation_short"] = df.apply(short_expl, axis=1)
-    df["explanation_long"] = df.apply(long_expl, axis=1)
+    df["explanation_short"] = short
+    df["explanation_long"] = long
 
     return df
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from typing import Dict, Any
 
+import numpy as np
 import pandas as pd
 
 from src.common.schema import MembersSchema, NbaUpliftSchema
@@ -23,22 +24,20 @@ def rank_member_recos(
 
     top_k = int(reco_cfg.get("top_k_recos", 5))
 
-    df = scored_df.copy()
+    # Stable sort by (membership_nbr, score desc), done on the two key
+    # columns only; ties keep their incoming order
+    member = scored_df[m_schema.membership_nbr].to_numpy()
+    order = np.lexsort((-scored_df["score"].to_numpy(), member))
 
-    # Sort by (membership_nbr, score desc)
-    df = df.sort_values(
-        by=[m_schema.membership_nbr, "score"],
-        ascending=[True, False],
-    )
-
-    # Rank within each member and keep top K
-    df["member_rank"] = (
-        df.groupby(m_schema.membership_nbr)["score"]
-        .rank(method="first", ascending=False)
-        .astype(int)
-    )
-
-    df = df[df["member_rank"] <= top_k]
+    # Position of each sorted row within its member's block -> keep top-K
+    member = member[order]
+    n = len(order)
+    block_start = np.ones(n, dtype=bool)
+    block_start[1:] = member[1:] != member[:-1]
+    member_rank = (
+        np.arange(n) - np.maximum.accumulate(np.where(block_start, np.arange(n), 0)) + 1
+    ).astype(np.int32)
+    keep = member_rank <= top_k
 
     # Keep the most relevant columns
     keep_cols = [
@@ -60,6 +59,10 @@ def rank_member_recos(
         "member_rank",
     ]
 
-    keep_cols = [c for c in keep_cols if c in df.columns]
+    keep_cols = [c for c in keep_cols if c in scored_df.columns]
+
+    # One gather of the kept rows and columns; member_rank goes last
+    df = scored_df.iloc[order[keep], scored_df.columns.get_indexer(keep_cols)]
+    df["member_rank"] = member_rank[keep]
 
-    return df[keep_cols]
+    return df
@@ -3,10 +3,13 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pandas as pd
+
 from src.common.utils import load_yaml
 from src.common.io import read_df, write_df
 from src.common.logging import setup_logger
-from src.reco.candidate_gen import generate_member_candidates
+from src.common.schema import MembersSchema
+from src.reco.candidate_gen import generate_top_member_candidates
 from src.reco.scorer import score_candidates
 from src.reco.ranker import rank_member_recos
 from src.reco.explanations import add_explanations
@@ -48,9 +51,13 @@ def main() -> None:
     logger.info("Loading NBA uplift summary from %s", nba_path)
     uplift_df = read_df(nba_path)
 
-    # 2) Generate candidates
+    # Each stage takes ownership of the previous stage's frame (scoring and
+    # explanations add their columns in place), so intermediates are never
+    # reused once handed on.
+
+    # 2) Generate candidates (only each segment's top-K can be a member's top-K)
     logger.info("Generating member-level candidates...")
-    candidates_df = generate_member_candidates(
+    candidates_df, uplift_range = generate_top_member_candidates(
         member_features_df=member_features_df,
         uplift_df=uplift_df,
         reco_cfg=reco_cfg,
@@ -59,20 +66,38 @@ def main() -> None:
 
     # 3) Score candidates
     logger.info("Scoring candidates...")
-    scored_df = score_candidates(candidates_df, reco_cfg=reco_cfg)
+    scored_df = score_candidates(
+        candidates_df, reco_cfg=reco_cfg, uplift_range=uplift_range
+    )
 
     # 4) Rank per member
     logger.info("Ranking top-K recommendations per member...")
     ranked_df = rank_member_recos(scored_df, reco_cfg=reco_cfg)
+    del candidates_df, scored_df
 
     # 5) Add explanations
     logger.info("Adding explanations...")
     explained_df = add_explanations(ranked_df)
 
-    # 6) Write output
+    # 6) Write output. The chat router filters this file on membership_nbr,
+    # so store the key with one canonical dtype the filter can match.
+    m_schema = MembersSchema()
+    key = explained_df[m_schema.membership_nbr]
+    if pd.api.types.is_numeric_dtype(key):
+        explained_df[m_schema.membership_nbr] = key.astype("int64")
+    else:
+        explained_df[m_schema.membership_nbr] = key.astype("string")
+
+    # Sorting by member keeps each row group's min/max to a narrow id range,
+    # so a single-member lookup prunes all but one or two row groups.
+    if not explained_df[m_schema.membership_nbr].is_monotonic_increasing:
+        explained_df = explained_df.sort_values(
+            m_schema.membership_nbr, kind="mergesort", ignore_index=True
+        )
+
     output_path = project_root / outputs_dir / "member_nba_recos.parquet"
     logger.info("Writing member NBA recommendations to %s", output_path)
-    write_df(explained_df, output_path, fmt="parquet")
+    write_df(explained_df, output_path, fmt="parquet", row_group_size=50_000)
 
     logger.info("Recommendation pipeline complete.")
 
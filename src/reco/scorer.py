@@ -1,7 +1,7 @@
 # src/reco/scorer.py
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 import numpy as np
 import pandas as pd
@@ -9,51 +9,75 @@ import pandas as pd
 from src.common.schema import MembersSchema, NbaUpliftSchema
 
 
-def _normalize_series(x: pd.Series) -> pd.Series:
-    """Min-max normalize to [0, 1]. If constant, return zeros."""
-    x_min = x.min()
-    x_max = x.max()
+# engagement_bucket category -> score; the last entry is for unknown
+# buckets (code -1), which score as medium.
+_ENGAGEMENT_BUCKETS = ["low", "medium", "high"]
+_ENGAGEMENT_LUT = np.array([0.0, 0.5, 1.0, 0.5], dtype=np.float32)
+
+
+def _min_max_normalize(
+    x: np.ndarray,
+    bounds: Tuple[float, float] | None = None,
+) -> np.ndarray:
+    """
+    Min-max normalize to [0, 1]. If constant, return zeros.
+
+    `bounds` overrides the (min, max) taken from `x` itself.
+    """
+    if len(x) == 0:
+        return x.astype(np.float32)
+    x_min, x_max = bounds if bounds is not None else (x.min(), x.max())
     denom = x_max - x_min
     if denom == 0:
-        return pd.Series(0.0, index=x.index)
-    return (x - x_min) / denom
+        return np.zeros(len(x), dtype=np.float32)
+    return (x - np.float32(x_min)) / np.float32(denom)
 
 
-def _engagement_score(engagement_bucket: pd.Series) -> pd.Series:
+def _engagement_score(engagement_bucket: pd.Series) -> np.ndarray:
     """
     engagement_bucket -> numeric:
     low -> 0.0
     medium -> 0.5
     high -> 1.0
+    (anything else -> 0.5)
     """
-    mapping = {"low": 0.0, "medium": 0.5, "high": 1.0}
-    return engagement_bucket.map(mapping).fillna(0.5)
+    codes = pd.Categorical(engagement_bucket, categories=_ENGAGEMENT_BUCKETS).codes
+    return _ENGAGEMENT_LUT[codes]
 
 
-def _risk_score(churn_risk_flag: pd.Series) -> pd.Series:
+def _risk_score(churn_risk_flag: pd.Series) -> np.ndarray:
     """
     Simple risk score from churn_risk_flag:
     1 -> high risk (1.0)
     0 -> low risk (0.0)
     """
-    return churn_risk_flag.astype(float)
+    return churn_risk_flag.to_numpy(dtype=np.float32)
 
 
 def score_candidates(
     candidates_df: pd.DataFrame,
     reco_cfg: Dict[str, Any],
+    uplift_range: Tuple[float, float] | None = None,
 ) -> pd.DataFrame:
     """
     Add a `score` column to member-level candidates using a simple
     weighted mixture of uplift, engagement, and risk.
+
+    The column is added in place when no rows need dropping, so the caller
+    should treat `candidates_df` as handed over.
+
+    `uplift_range` is the (min, max) uplift in bps to normalize against;
+    by default it is taken from `candidates_df`.
     """
     m_schema = MembersSchema()
     u_schema = NbaUpliftSchema()
 
-    df = candidates_df.copy()
-
     # Drop rows where entity info is missing (e.g., if no candidates for a segment)
-    df = df[df[u_schema.entity_type].notna()]
+    has_entity = candidates_df[u_schema.entity_type].notna().to_numpy()
+    if has_entity.all():
+        df = candidates_df
+    else:
+        df = candidates_df.take(np.flatnonzero(has_entity))
 
     uplift_weight = float(reco_cfg.get("weights", {}).get("uplift_weight", 0.6))
     engagement_weight = float(
@@ -64,8 +88,11 @@ def score_candidates(
     )  # reusing as risk weight
 
     # 1) Uplift in basis points, then normalized
-    uplift_bps = df[u_schema.incremental_renewal_rate] * 10000.0
-    uplift_norm = _normalize_series(uplift_bps)
+    uplift_bps = (
+        df[u_schema.incremental_renewal_rate].to_numpy(dtype=np.float32)
+        * np.float32(10000.0)
+    )
+    uplift_norm = _min_max_normalize(uplift_bps, uplift_range)
 
     # 2) Engagement score from bucket
     if "engagement_bucket" not in df.columns:
@@ -83,11 +110,11 @@ def score_candidates(
         )
     risk = _risk_score(df["churn_risk_flag"])
 
-    # Final score = weighted sum
-    df["score"] = (
-        uplift_weight * uplift_norm
-        + engagement_weight * engagement
-        + risk_weight * risk
+    # Final score = weighted sum, as one float32 (n, 3) @ (3,) product
+    features = np.column_stack([uplift_norm, engagement, risk])
+    weights = np.array(
+        [uplift_weight, engagement_weight, risk_weight], dtype=np.float32
     )
+    df["score"] = features @ weights
 
     return df
@@ -1,8 +1,51 @@
 from __future__ import annotations
 from typing import Dict, Any
+import numpy as np
 import pandas as pd
 from src.common.schema import NbaUpliftSchema
 
+def _num_str(values: pd.Series, fmt: str) -> np.ndarray:
+    # printf-style formatting of a whole numeric column at once
+    return np.char.mod(fmt, values.to_numpy()).astype(object)
+
+
+def _format_facts(df: pd.DataFrame, s: NbaUpliftSchema) -> np.ndarray:
+    """One fact sentence per row, assembled column-wise."""
+    e_type = df[s.entity_type].astype(str).to_numpy(dtype=object)
+    e_name = (
+        df[s.entity_name]
+        .where(
+            df[s.entity_name].notna(),
+            df[s.entity_type].astype(str) + "_" + df[s.entity_id].astype(str),
+        )
+        .astype(str)
+        .to_numpy(dtype=object)
+    )
+
+    return (
+        "For Persona "
+        + _num_str(df[s.persona_id].astype("int64"), "%d")
+        + " members in tenure bucket '"
+        + df[s.tenure_bucket].astype(str).to_numpy(dtype=object)
+        + "', "
+        + e_type
+        + " '"
+        + e_name
+        + "' shows an estimated incremental renewal uplift of about "
+        + _num_str(df[s.incremental_renewal_rate] * 10000.0, "%.0f")
+        + " basis points. In the synthetic-control analysis, the renewal rate for "
+        "exposed members was "
+        + _num_str(df[s.test_renewal_rate] * 100.0, "%.1f%%")
+        + ", compared with "
+        + _num_str(df[s.control_renewal_rate] * 100.0, "%.1f%%")
+        + " for matched controls, based on "
+        + _num_str(df[s.n_test_matched].astype("int64"), "%d")
+        + " test and "
+        + _num_str(df[s.n_control_matched].astype("int64"), "%d")
+        + " control members."
+    )
+
+
 def build_nba_fact_corpus(
         uplift_df: pd.DataFrame,
         cfg: Dict[str, Any] | None = None,
@@ -17,27 +60,6 @@ def build_nba_fact_corpus(
             support = df[s.n_test_matched] + df[s.n_control_matched]
             df = df[support >= min_support]
 
-    def format_fact(row) -> str:
-        persona = int(row[s.persona_id])
-        tenure = row[s.tenure_bucket]
-        e_type = row[s.entity_type]
-        e_name = row.get(s.entity_name, f"{e_type}_{int(row[s.entity_id])}")
-        uplift = row[s.incremental_renewal_rate]
-        uplift_bps = uplift * 10000.0
-        test_rate = row[s.test_renewal_rate]
-        control_rate = row[s.control_renewal_rate]
-        n_test = int(row[s.n_test_matched])
-        n_control = int(row[s.n_control_matched])
-
-        return (
-            f"For Persona {persona} members in tenure bucket '{tenure}', {e_type} "
-            f"'{e_name}' shows an estimated incremental renewal uplift of about "
-            f"{uplift_bps:.0f} basis points. In the synthetic-control analysis, the "
-            f"renewal rate for exposed members was {test_rate:.1%}, compared with "
-            f"{control_rate:.1%} for matched controls, based on {n_test} test and "
-            f"{n_control} control members."
-        )
-
     df["doc_id"] = (
         "nba_fact:"
         + df[s.persona_id].astype(str)
@@ -50,7 +72,7 @@ def build_nba_fact_corpus(
     )
 
     df["doc_type"] = "nba_fact"
-    df["text"] = df.apply(format_fact, axis=1)
+    df["text"] = _format_facts(df, s)
 
     corpus = df[
         [
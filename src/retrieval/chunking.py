@@ -1,8 +1,13 @@
 # src/retrieval/chunking.py
 from __future__ import annotations
 
-from typing import Iterable, List, Dict, Any
+from typing import Iterable, Iterator, List, Dict, Any
 import pandas as pd
+import pyarrow as pa
+
+
+# Rows turned into documents per batch
+_DOC_BATCH_ROWS = 10_000
 
 
 def trivial_chunk_corpus(corpus_df: pd.DataFrame) -> pd.DataFrame:
@@ -13,19 +18,51 @@ def trivial_chunk_corpus(corpus_df: pd.DataFrame) -> pd.DataFrame:
     return corpus_df.copy()
 
 
+def _column_docs(
+    ids: Iterable[Any],
+    texts: Iterable[Any],
+    meta_cols: List[str],
+    meta_values: List[Iterable[Any]],
+) -> Iterator[Dict[str, Any]]:
+    # Walk plain column arrays instead of boxing every row into a Series
+    for doc_id, text, *vals in zip(ids, texts, *meta_values):
+        yield {"id": doc_id, "text": text, "metadata": dict(zip(meta_cols, vals))}
+
+
 def to_documents(
-    corpus_df: pd.DataFrame,
+    corpus: pd.DataFrame | pa.Table,
     text_col: str = "text",
     id_col: str = "doc_id",
-) -> List[Dict[str, Any]]:
+    batch_size: int = _DOC_BATCH_ROWS,
+) -> Iterator[Dict[str, Any]]:
     """
-    Turn a corpus DataFrame into a list of documents:
+    Lazily turn a corpus DataFrame or Arrow table into documents:
     {id, text, metadata}.
+
+    Columns are converted `batch_size` rows at a time, so only one batch
+    of rows is held as Python objects at once.
     """
-    docs: List[Dict[str, Any]] = []
-    for _, row in corpus_df.iterrows():
-        meta = row.to_dict()
-        text = meta.pop(text_col)
-        doc_id = meta.pop(id_col)
-        docs.append({"id": doc_id, "text": text, "metadata": meta})
-    return docs
+    if isinstance(corpus, pa.Table):
+        meta_cols = [c for c in corpus.column_names if c not in (text_col, id_col)]
+        for batch in corpus.to_batches(max_chunksize=batch_size):
+
+            def _values(name: str) -> Any:
+                return batch.column(name).to_numpy(zero_copy_only=False)
+
+            yield from _column_docs(
+                _values(id_col),
+                _values(text_col),
+                meta_cols,
+                [_values(c) for c in meta_cols],
+            )
+        return
+
+    meta_cols = [c for c in corpus.columns if c not in (text_col, id_col)]
+    for start in range(0, len(corpus), batch_size):
+        part = corpus.iloc[start : start + batch_size]
+        yield from _column_docs(
+            part[id_col].to_numpy(),
+            part[text_col].to_numpy(),
+            meta_cols,
+            [part[c].to_numpy() for c in meta_cols],
+        )
@@ -42,7 +42,7 @@ def main() -> None:
     # 2) Chunk (no-op for now)
     corpus_df = trivial_chunk_corpus(corpus_df)
 
-    # 3) Convert to docs
+    # 3) Convert to docs (a generator; the store embeds them batch by batch)
     docs = to_documents(corpus_df, text_col="text", id_col="doc_id")
 
     # 4) Build vector index
@@ -58,11 +58,30 @@ def main() -> None:
             "meta_file", "metadata.parquet"
         ),
         normalize=bool(retrieval_cfg.get("embedding", {}).get("normalize", True)),
+        index_factory=retrieval_cfg.get("embedding", {}).get("index_factory", "Flat"),
+        nprobe=int(retrieval_cfg.get("embedding", {}).get("nprobe", 16)),
+        ef_search=int(retrieval_cfg.get("embedding", {}).get("ef_search", 64)),
+        ivf_min_docs=int(
+            retrieval_cfg.get("embedding", {}).get("ivf_min_docs", 100_000)
+        ),
+        encode_batch_size=int(
+            retrieval_cfg.get("embedding", {}).get("encode_batch_size", 64)
+        ),
+        num_threads=int(retrieval_cfg.get("embedding", {}).get("num_threads", 0)),
+        faiss_threads=int(
+            retrieval_cfg.get("embedding", {}).get("faiss_threads", 0)
+        ),
+        encode_processes=int(
+            retrieval_cfg.get("embedding", {}).get("encode_processes", 0)
+        ),
+        encoder_backend=retrieval_cfg.get("embedding", {}).get(
+            "encoder_backend", "torch"
+        ),
     )
 
     logger.info("Building vector store with model '%s'", vs_cfg.model_name)
     store = VectorStore(cfg=vs_cfg, base_dir=retrieval_dir)
-    store.build_from_docs(docs)
+    store.build_from_docs(docs, n_docs=len(corpus_df))
     store.save()
 
     logger.info("Retrieval index built and saved in %s", retrieval_dir)
@@ -1,15 +1,23 @@
 # src/retrieval/vector_store.py
 from __future__ import annotations
 
+import math
+import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from itertools import islice
+from typing import Iterable, List, Dict, Any, Sized, Tuple
 
 import faiss
 import numpy as np
 import pandas as pd
+import torch
 from sentence_transformers import SentenceTransformer
 
+from src.common.io import read_df, write_df
+
 
 @dataclass
 class VectorStoreConfig:
@@ -17,6 +25,32 @@ class VectorStoreConfig:
     index_file: str = "faiss_index.bin"
     meta_file: str = "metadata.parquet"
     normalize: bool = True
+    # faiss.index_factory spec (inner-product metric). "Flat" is exact FP32
+    # search; "SQfp16" / "SQ8" scan 2x / 4x smaller codes, and e.g.
+    # "IVF1024,PQ48x4fs" or "HNSW32" trade recall for memory / speed on large
+    # corpora. "auto" picks by corpus size (see _auto_index_factory).
+    index_factory: str = "Flat"
+    ivf_min_docs: int = 100_000  # "auto": corpora this large get an IVF index
+    nprobe: int = 16  # IVF lists scanned per query
+    ef_search: int = 64  # HNSW search breadth
+    train_sample: int = 100_000  # vectors used to train IVF / PQ indexes
+    query_cache_size: int = 4096  # query embeddings kept for repeat queries
+    encode_batch_size: int = 64  # texts per model forward pass
+    num_threads: int = 0  # torch CPU threads for encoding (0 = torch default)
+    # OpenMP threads for Faiss build / search (0 = all cores); the
+    # FAISS_THREADS environment variable overrides it
+    faiss_threads: int = 0
+    # Worker processes for corpus encoding in build_from_docs (one per GPU
+    # when several are visible, else CPU workers); 0 or 1 = in-process
+    encode_processes: int = 0
+    # "torch" or "onnx" (ONNX Runtime via optimum; needs
+    # `pip install sentence-transformers[onnx]`, sentence-transformers>=3.2)
+    encoder_backend: str = "torch"
+    onnx_dir: str = "encoder_onnx"  # exported ONNX model, under base_dir
+
+
+# Smallest build batch worth sharding across encoding worker processes
+_POOL_MIN_DOCS = 1000
 
 
 class VectorStore:
@@ -25,38 +59,246 @@ class VectorStore:
         self.base_dir = base_dir
         self.base_dir.mkdir(parents=True, exist_ok=True)
 
+        # Pin explicitly: an inherited OMP_NUM_THREADS=1 (common in
+        # containers) would otherwise leave Faiss silently single-threaded
+        faiss_threads = int(os.getenv("FAISS_THREADS", cfg.faiss_threads))
+        faiss.omp_set_num_threads(faiss_threads or os.cpu_count() or 1)
+
         self.model: SentenceTransformer | None = None
-        self.index: faiss.IndexFlatIP | None = None
+        self.index: faiss.Index | None = None
         self.metadata: pd.DataFrame | None = None
 
+        # LRU of query text -> embedding row; the store is shared across
+        # API worker threads, hence the lock
+        self._query_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
+        # Filter columns as (int32 codes, uniques), factorized on first use
+        self._meta_codes: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+
     # ---------------- Embeddings ---------------- #
 
     def _get_model(self) -> SentenceTransformer:
         if self.model is None:
-            self.model = SentenceTransformer(self.cfg.model_name)
+            if self.cfg.num_threads > 0:
+                torch.set_num_threads(self.cfg.num_threads)
+            if self.cfg.encoder_backend == "onnx":
+                self.model = self._load_onnx_model()
+            elif torch.cuda.is_available():
+                # FP16 weights: ~2x encode throughput on GPU
+                self.model = SentenceTransformer(self.cfg.model_name, device="cuda")
+                self.model.half()
+            else:
+                self.model = SentenceTransformer(self.cfg.model_name)
         return self.model
 
-    def encode(self, texts: List[str]) -> np.ndarray:
+    def _load_onnx_model(self) -> SentenceTransformer:
+        """
+        Load the encoder on ONNX Runtime. The first load exports the
+        checkpoint and saves it under `onnx_dir`; later loads reuse that.
+        Tokenization, pooling and normalization stay those of the model.
+        """
+        onnx_path = self.base_dir / self.cfg.onnx_dir
+        if (onnx_path / "onnx" / "model.onnx").exists():
+            return SentenceTransformer(str(onnx_path), backend="onnx")
+        model = SentenceTransformer(self.cfg.model_name, backend="onnx")
+        model.save_pretrained(str(onnx_path))
+        return model
+
+    def encode(
+        self,
+        texts: List[str],
+        pool: Dict[str, Any] | None = None,
+    ) -> np.ndarray:
+        """
+        Embed `texts`; with a `pool` from `_start_encode_pool`, the texts are
+        sharded across its worker processes.
+        """
         model = self._get_model()
-        emb = model.encode(texts, show_progress_bar=False)
-        emb = np.asarray(emb, dtype="float32")
-        if self.cfg.normalize:
-            faiss.normalize_L2(emb)
+        if pool is not None:
+            n_workers = len(pool["processes"])
+            chunk_size = min(math.ceil(len(texts) / n_workers / 10), 5000)
+            emb = model.encode_multi_process(
+                texts,
+                pool,
+                batch_size=self.cfg.encode_batch_size,
+                chunk_size=chunk_size,
+                normalize_embeddings=self.cfg.normalize,
+            )
+        else:
+            emb = model.encode(
+                texts,
+                batch_size=self.cfg.encode_batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=self.cfg.normalize,
+                show_progress_bar=False,
+            )
+        if emb.dtype != np.float32:
+            # FP16 model output: re-normalize after the upcast so inner
+            # products stay true cosines
+            emb = emb.astype("float32")
+            if self.cfg.normalize:
+                faiss.normalize_L2(emb)
         return emb
 
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Like `encode`, but repeat queries are served from an LRU cache and
+        only unseen ones go through the model (in one batch).
+
+        Keyed on the exact text, so cased models see what they always saw.
+        """
+        cached: Dict[str, np.ndarray] = {}
+        with self._query_cache_lock:
+            for q in queries:
+                emb = self._query_cache.get(q)
+                if emb is not None:
+                    self._query_cache.move_to_end(q)
+                    cached[q] = emb
+
+        missing = list(dict.fromkeys(q for q in queries if q not in cached))
+        if missing:
+            fresh = self.encode(missing)
+            with self._query_cache_lock:
+                for q, emb in zip(missing, fresh):
+                    cached[q] = emb
+                    self._query_cache[q] = emb
+                    self._query_cache.move_to_end(q)
+                while len(self._query_cache) > self.cfg.query_cache_size:
+                    self._query_cache.popitem(last=False)
+
+        return np.stack([cached[q] for q in queries])
+
+    def _start_encode_pool(self) -> Dict[str, Any] | None:
+        """Start `encode_processes` encoding workers, or None if disabled."""
+        n = self.cfg.encode_processes
+        if n <= 1:
+            return None
+        if torch.cuda.device_count() > 1:
+            devices = [f"cuda:{i}" for i in range(min(n, torch.cuda.device_count()))]
+        else:
+            devices = ["cpu"] * n
+        return self._get_model().start_multi_process_pool(target_devices=devices)
+
     # ---------------- Build / Persist ---------------- #
 
-    def build_from_docs(self, docs: List[Dict[str, Any]]) -> None:
-        texts = [d["text"] for d in docs]
-        metas = [d["metadata"] | {"doc_id": d["id"]} for d in docs]
+    def build_from_docs(
+        self,
+        docs: Iterable[Dict[str, Any]],
+        batch_size: int = 8192,
+        n_docs: int | None = None,
+    ) -> None:
+        """
+        Embed and index `docs` (any iterable, e.g. a lazy `to_documents`
+        generator), encoding `batch_size` documents at a time.
+
+        Indexes that need no training (Flat, SQfp16, HNSW) take each batch
+        as soon as it is encoded, so embeddings never pile up in memory.
+        IVF / PQ indexes, and "auto" without a known doc count (`n_docs`,
+        or `len(docs)` for sized iterables), keep the batches until the end
+        to pick the spec and draw a training sample.
+        """
+        if n_docs is None and isinstance(docs, Sized):
+            n_docs = len(docs)
+        docs = iter(docs)
+        meta_parts: List[pd.DataFrame] = []
+        pending: List[np.ndarray] = []  # encoded, not yet in the index
+        index: faiss.Index | None = None
+        pool: Dict[str, Any] | None = None
+        try:
+            while batch := list(islice(docs, batch_size)):
+                # Worker start-up only pays off on a sizeable corpus
+                if pool is None and len(batch) > _POOL_MIN_DOCS:
+                    pool = self._start_encode_pool()
+                # Encode each distinct text once (templated facts can repeat);
+                # factorize keeps first-seen order, so all-unique batches
+                # need no scatter
+                codes, uniques = pd.factorize(
+                    np.array([d["text"] for d in batch], dtype=object)
+                )
+                emb = self.encode(uniques.tolist(), pool=pool)
+                emb = emb if len(uniques) == len(batch) else emb[codes]
+                meta_parts.append(_batch_metadata(batch))
+
+                if index is None:
+                    spec = self.cfg.index_factory
+                    if spec == "auto" and n_docs is not None:
+                        spec = self._auto_index_factory(n_docs, emb.shape[1])
+                    if spec != "auto":
+                        index = faiss.index_factory(
+                            emb.shape[1], spec, faiss.METRIC_INNER_PRODUCT
+                        )
+                if index is not None and index.is_trained:
+                    index.add(emb)
+                else:
+                    pending.append(emb)
+        finally:
+            if pool is not None:
+                self._get_model().stop_multi_process_pool(pool)
+        if not meta_parts:
+            raise ValueError("No documents to index.")
 
-        embeddings = self.encode(texts)
-        dim = embeddings.shape[1]
-        index = faiss.IndexFlatIP(dim)
-        index.add(embeddings)
+        if pending:
+            n = sum(len(e) for e in pending)
+            dim = pending[0].shape[1]
+            if index is None:
+                spec = self._auto_index_factory(n, dim)
+                index = faiss.index_factory(dim, spec, faiss.METRIC_INNER_PRODUCT)
+            if not index.is_trained:
+                # Faiss wants ~40 training points per IVF list
+                nlist = getattr(faiss.try_extract_index_ivf(index), "nlist", 0)
+                n_train = min(n, max(self.cfg.train_sample, 40 * nlist))
+                rng = np.random.default_rng(0)
+                sample_idx = np.sort(rng.choice(n, n_train, replace=False))
+                index.train(_gather_rows(pending, sample_idx))
+            # Add batch by batch, releasing each one, rather than
+            # concatenating a second full copy of the embeddings
+            pending.reverse()
+            while pending:
+                index.add(pending.pop())
 
         self.index = index
-        self.metadata = pd.DataFrame(metas)
+        self._set_search_params()
+        self.metadata = pd.concat(meta_parts, ignore_index=True)
+        self._meta_codes.clear()
+
+    def _auto_index_factory(self, n: int, dim: int) -> str:
+        """
+        Brute-force scan over FP16 codes below `ivf_min_docs`; IVF with
+        ~4*sqrt(n) lists over 8-bit codes above, switching to 8-bit PQ
+        (32 sub-vectors) past a million vectors.
+
+        Scans are memory-bound, so smaller codes are also faster: FP16 halves
+        the bytes read with no measurable recall loss, int8 quarters them.
+        """
+        if n < self.cfg.ivf_min_docs:
+            return "SQfp16"
+        nlist = int(4 * np.sqrt(n))
+        if n >= 1_000_000 and dim % 32 == 0:
+            return f"IVF{nlist},PQ32x8"
+        return f"IVF{nlist},SQ8"
+
+    def _search_params(self, sel: faiss.IDSelector) -> faiss.SearchParameters:
+        """
+        Per-call search parameters with an id selector. They replace the
+        index's own settings, so nprobe / efSearch are carried over.
+        """
+        index = faiss.downcast_index(self.index)
+        if faiss.try_extract_index_ivf(index) is not None:
+            return faiss.SearchParametersIVF(sel=sel, nprobe=self.cfg.nprobe)
+        if getattr(index, "hnsw", None) is not None:
+            return faiss.SearchParametersHNSW(sel=sel, efSearch=self.cfg.ef_search)
+        return faiss.SearchParameters(sel=sel)
+
+    def _set_search_params(self) -> None:
+        """Apply nprobe / efSearch to approximate indexes (no-op for Flat)."""
+        try:
+            faiss.extract_index_ivf(self.index).nprobe = self.cfg.nprobe
+        except RuntimeError:
+            pass
+        hnsw = getattr(faiss.downcast_index(self.index), "hnsw", None)
+        if hnsw is not None:
+            hnsw.efSearch = self.cfg.ef_search
 
     def save(self) -> None:
         if self.index is None or self.metadata is None:
@@ -65,8 +307,14 @@ class VectorStore:
         index_path = self.base_dir / self.cfg.index_file
         meta_path = self.base_dir / self.cfg.meta_file
 
-        faiss.write_index(self.index, str(index_path))
-        self.metadata.to_parquet(meta_path, index=False)
+        # Write-then-rename: a server that has the old file memory-mapped
+        # keeps reading the old inode instead of a half-written one
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        faiss.write_index(self.index, str(tmp_path))
+        os.replace(tmp_path, index_path)
+        # Shared parquet defaults: zstd, dictionary-encoded strings, large
+        # row groups
+        write_df(self.metadata, meta_path)
 
     def load(self) -> None:
         index_path = self.base_dir / self.cfg.index_file
@@ -77,11 +325,42 @@ class VectorStore:
                 "Index or metadata not found. Run build step first."
             )
 
-        self.index = faiss.read_index(str(index_path))
-        self.metadata = pd.read_parquet(meta_path)
+        # Memory-map the stored vectors / codes instead of copying them into
+        # RAM: load is near-instant and pages come in from the OS page cache.
+        # Faiss builds without IO_FLAG_MMAP_IFC read the index into memory.
+        io_flags = getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+        self.index = faiss.read_index(str(index_path), io_flags)
+        self._set_search_params()
+        self.metadata = read_df(meta_path)
+        self._meta_codes.clear()
 
     # ---------------- Query ---------------- #
 
+    def _column_codes(self, col: str) -> Tuple[np.ndarray, pd.Index]:
+        codes = self._meta_codes.get(col)
+        if codes is None:
+            values, uniques = pd.factorize(self.metadata[col])
+            codes = (values.astype(np.int32, copy=False), uniques)
+            self._meta_codes[col] = codes
+        return codes
+
+    def _filter_mask(self, filters: Dict[str, Any]) -> np.ndarray | None:
+        """
+        Boolean row mask for exact-match `filters` on metadata columns
+        (unknown columns are ignored; None if nothing applies). Each filter
+        is an int32 code comparison against the column's factorized codes.
+        """
+        mask = None
+        for key, val in filters.items():
+            if key not in self.metadata.columns:
+                continue
+            codes, uniques = self._column_codes(key)
+            code = uniques.get_indexer([val])[0]
+            # -1 = value not present (NaN rows also carry code -1)
+            col_mask = codes == code if code >= 0 else np.zeros(len(codes), bool)
+            mask = col_mask if mask is None else mask & col_mask
+        return mask
+
     def search(
         self,
         query: str,
@@ -92,39 +371,87 @@ class VectorStore:
         Search top_k documents for a query.
         Optional filters on metadata (exact match).
         """
+        return self.search_batch([query], top_k=top_k, filters=filters)[0]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Dict[str, Any] | None = None,
+        query_embeddings: np.ndarray | None = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search top_k documents for each query with one encode and one index
+        search over all of them. Returns one result list per query.
+
+        `query_embeddings` (shape (len(queries), dim)) skips encoding when
+        the caller already embedded the queries with this store.
+        """
         if self.index is None or self.metadata is None:
             raise RuntimeError("Index not loaded; call load() first.")
 
-        # Optional filter subset
-        meta = self.metadata
-        if filters:
-            for key, val in filters.items():
-                if key in meta.columns:
-                    meta = meta[meta[key] == val]
-
-        if meta.empty:
-            return []
-
-        # Map filtered subset to index rows
-        # We assume rows are in the same order as embeddings were added
-        subset_indices = meta.index.to_numpy()
-        # Encode query
-        q_emb = self.encode([query])
-        # Search full index then mask to subset for simplicity
-        # (If performance is an issue later, build per-segment indices)
-        scores, idxs = self.index.search(q_emb, top_k * 5)  # over-fetch then filter
-
-        results: List[Dict[str, Any]] = []
-        for score, idx in zip(scores[0], idxs[0]):
-            if idx < 0:
-                continue
-            if idx not in subset_indices:
-                # skip if not in filtered metadata
-                continue
-            row = self.metadata.loc[idx].to_dict()
-            row["score"] = float(score)
-            results.append(row)
-            if len(results) >= top_k:
-                break
+        # Optional filter subset, as a row mask (None = every row)
+        mask = self._filter_mask(filters) if filters else None
+        if (mask is not None and not mask.any()) or not queries:
+            return [[] for _ in queries]
+
+        # Encode queries
+        if query_embeddings is None:
+            query_embeddings = self.encode_queries(queries)
+        q_emb = np.ascontiguousarray(query_embeddings, dtype="float32")
+
+        if mask is not None and not mask.all():
+            # Restrict the search itself to the filtered rows, so selective
+            # filters still return top_k hits. Index ids are row positions:
+            # embeddings were added in metadata order.
+            bits = np.packbits(mask, bitorder="little")
+            sel = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits))
+            scores, idxs = self.index.search(
+                q_emb, top_k, params=self._search_params(sel)
+            )
+        else:
+            scores, idxs = self.index.search(q_emb, top_k)
+
+        # Gather every hit's metadata with one positional take; per-column
+        # tolist() + zip beats to_dict("records") on these few-row frames
+        hit = idxs >= 0
+        hits = self.metadata.iloc[idxs[hit]]
+        cols = [*hits.columns, "score"]
+        values = [hits[c].tolist() for c in hits.columns] + [scores[hit].tolist()]
+        rows = [dict(zip(cols, row_values)) for row_values in zip(*values)]
+
+        all_results: List[List[Dict[str, Any]]] = []
+        start = 0
+        for n_hits in hit.sum(axis=1).tolist():
+            all_results.append(rows[start : start + n_hits])
+            start += n_hits
+
+        return all_results
+
+
+def _batch_metadata(batch: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Metadata frame for one build batch: each doc's metadata plus `doc_id`.
+    When every doc carries the same keys (as `to_documents` output does),
+    rows go in as plain value tuples instead of one merged dict per doc.
+    """
+    keys = batch[0]["metadata"].keys()
+    if any(d["metadata"].keys() != keys for d in batch):
+        return pd.DataFrame([d["metadata"] | {"doc_id": d["id"]} for d in batch])
+    return pd.DataFrame.from_records(
+        [(*d["metadata"].values(), d["id"]) for d in batch],
+        columns=[*keys, "doc_id"],
+    )
+
 
-        return results
+def _gather_rows(chunks: List[np.ndarray], rows: np.ndarray) -> np.ndarray:
+    """
+    Rows at (sorted, global) positions `rows` of the row-wise concatenation
+    of `chunks`, without building the concatenation.
+    """
+    bounds = np.cumsum([0, *(len(c) for c in chunks)])
+    parts = []
+    for chunk, lo, hi in zip(chunks, bounds[:-1], bounds[1:]):
+        in_chunk = rows[(rows >= lo) & (rows < hi)]
+        parts.append(chunk[in_chunk - lo])
+    return np.concatenate(parts)
@@ -2,29 +2,54 @@
 
 from __future__ import annotations
 
+import json
 import os
+from typing import Iterator
+
 import requests
 import streamlit as st
 
 DEFAULT_API_URL = "http://localhost:8000/api/chat"
 API_URL = os.getenv("RENEWAL_API_URL", DEFAULT_API_URL)
+STREAM_API_URL = f"{API_URL.rstrip('/')}/stream"
+
 
+def stream_backend(
+    user_query: str,
+    membership_nbr: int | None,
+    session: requests.Session | None = None,
+    meta: dict | None = None,
+) -> Iterator[str]:
+    """
+    Call FastAPI /api/chat/stream and yield answer text as it arrives.
 
-def call_backend(user_query: str, membership_nbr: int | None) -> dict:
-    """Call FastAPI /api/chat endpoint and return parsed JSON."""
+    The "meta" / "done" events (intent, membership_nbr, full answer) are
+    merged into `meta` when given.
+    """
     payload: dict = {"user_query": user_query}
     if membership_nbr is not None:
         payload["membership_nbr"] = membership_nbr
 
-    resp = requests.post(API_URL, json=payload, timeout=60)
-    resp.raise_for_status()
-    return resp.json()
+    http = session if session is not None else requests
+    with http.post(STREAM_API_URL, json=payload, timeout=60, stream=True) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if event.get("event") == "delta":
+                yield event.get("content", "")
+            elif meta is not None:
+                meta.update({k: v for k, v in event.items() if k != "event"})
 
 
 def _init_session_state() -> None:
     if "messages" not in st.session_state:
         # list[dict]: {"role": "user"/"assistant", "content": str}
         st.session_state["messages"] = []
+    if "http" not in st.session_state:
+        # One HTTP session per browser session: keep-alive across questions
+        st.session_state["http"] = requests.Session()
 
 
 def main() -> None:
@@ -78,21 +103,26 @@ def main() -> None:
             except ValueError:
                 st.warning("Membership number must be an integer. Ignoring it for this query.")
 
-        # Call backend
+        # Call backend; the answer renders token by token as it streams in
         try:
-            backend_resp = call_backend(user_query, membership_nbr)
-            answer = backend_resp.get("answer", "").strip() or "(No answer returned)"
-            intent = backend_resp.get("intent", "unknown")
-            used_member = backend_resp.get("membership_nbr")
-
-            # Store only the answer in history
-            st.session_state["messages"].append(
-                {"role": "assistant", "content": answer}
-            )
-
+            backend_meta: dict = {}
             with chat_container:
                 with st.chat_message("assistant"):
-                    st.markdown(answer)
+                    streamed = st.write_stream(
+                        stream_backend(
+                            user_query,
+                            membership_nbr,
+                            session=st.session_state["http"],
+                            meta=backend_meta,
+                        )
+                    )
+                    answer = str(backend_meta.get("answer") or streamed or "").strip()
+                    answer = answer or "(No answer returned)"
+                    if not streamed:
+                        st.markdown(answer)
+                    intent = backend_meta.get("intent", "unknown")
+                    used_member = backend_meta.get("membership_nbr")
+
                     with st.expander("Debug info (intent, member, etc.)", expanded=False):
                         st.write(
                             {
@@ -101,6 +131,11 @@ def main() -> None:
                             }
                         )
 
+            # Store only the answer in history
+            st.session_state["messages"].append(
+                {"role": "assistant", "content": answer}
+            )
+
         except requests.HTTPError as e:
             msg = f"Backend error: {e.response.status_code} {e.response.text}"
             st.error(msg)
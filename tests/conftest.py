@@ -3,6 +3,8 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # tests/ -> repo root
 ROOT = Path(__file__).resolve().parents[1]
 
@@ -10,3 +12,16 @@ ROOT = Path(__file__).resolve().parents[1]
 root_str = str(ROOT)
 if root_str not in sys.path:
     sys.path.insert(0, root_str)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    One API TestClient for the whole session. Imported lazily, so test
+    files that don't use it never pull in FastAPI / FAISS / torch.
+    """
+    from fastapi.testclient import TestClient
+
+    from src.api.main import app
+
+    return TestClient(app)
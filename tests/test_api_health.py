@@ -1,14 +1,7 @@
 # tests/test_api_health.py
 
-from fastapi.testclient import TestClient
 
-from src.api.main import app
-
-
-client = TestClient(app)
-
-
-def test_health_endpoint():
+def test_health_endpoint(client):
     """Basic health check endpoint should return 200 and 'ok'."""
     resp = client.get("/api/health")
     assert resp.status_code == 200
@@ -17,7 +10,7 @@ def test_health_endpoint():
     assert data.get("status") == "ok"
 
 
-def test_chat_endpoint_with_stubbed_router(monkeypatch):
+def test_chat_endpoint_with_stubbed_router(client, monkeypatch):
     """
     Test /api/chat without requiring Ollama or the full pipeline.
 
@@ -42,3 +35,28 @@ def test_chat_endpoint_with_stubbed_router(monkeypatch):
     data = resp.json()
     assert data.get("answer") == "stubbed answer"
     assert data.get("intent") == "general_help"
+
+
+def test_chat_stream_endpoint_with_stubbed_router(client, monkeypatch):
+    """/api/chat/stream relays the router's events as NDJSON lines."""
+    import json
+
+    from src.api import routes as routes_module
+
+    def fake_answer_query_stream(user_query, membership_nbr=None, project_root=None):
+        yield {"event": "meta", "intent": "general_help", "membership_nbr": 7}
+        yield {"event": "delta", "content": "stubbed "}
+        yield {"event": "delta", "content": "answer"}
+        yield {"event": "done", "answer": "stubbed answer"}
+
+    monkeypatch.setattr(routes_module, "answer_query_stream", fake_answer_query_stream)
+
+    payload = {"user_query": "Test question from pytest", "membership_nbr": 7}
+    resp = client.post("/api/chat/stream", json=payload)
+
+    assert resp.status_code == 200
+    events = [json.loads(line) for line in resp.text.splitlines() if line]
+    assert [e["event"] for e in events] == ["meta", "delta", "delta", "done"]
+    assert events[0]["membership_nbr"] == 7
+    deltas = [e["content"] for e in events if e["event"] == "delta"]
+    assert "".join(deltas) == "stubbed answer"
@@ -11,3 +11,30 @@ def test_member_features_exist():
     df = read_df(members_path)
     assert len(df) > 0
     assert "membership_nbr" in df.columns
+
+
+def test_partitioned_nba_uplift_reads_back_as_written(tmp_path):
+    """
+    Reading the persona-partitioned dataset gives the frame that was
+    generated: same column order, dtypes and row order, also past 9
+    personas where path order would put persona_id=10 before persona_id=2.
+    """
+    import pandas as pd
+
+    from src.data_gen.generate_nba_uplift import generate_nba_uplift
+
+    cfg = {
+        "seed": 7,
+        "n_personas": 11,
+        "entity_specs": {"action": 3, "service": 2, "category": 2, "sub_category": 2},
+    }
+    out_path = tmp_path / "nba_uplift_summary.parquet"
+    expected = generate_nba_uplift(cfg, output_path=out_path).reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(read_df(out_path), expected)
+
+    one_persona = read_df(out_path, filters=[("persona_id", "=", 10)])
+    pd.testing.assert_frame_equal(
+        one_persona,
+        expected[expected["persona_id"] == 10].reset_index(drop=True),
+    )
@@ -0,0 +1,22 @@
+# tests/test_features.py
+
+import numpy as np
+import pandas as pd
+
+from src.features.build_member_features import _compute_engagement_bucket
+
+
+def test_engagement_bucket_handles_nan_and_odd_deciles():
+    """
+    Unexpected deciles (NaN, non-integers between bands) map to "medium";
+    out-of-range values still land in the low / high buckets.
+    """
+    deciles = pd.Series([1, 3, 4, 7, 8, 10, np.nan, 7.5, 0, 12, 2.5], index=range(10, 21))
+
+    buckets = _compute_engagement_bucket(deciles)
+
+    assert buckets.tolist() == [
+        "low", "low", "medium", "medium", "high", "high",
+        "medium", "medium", "low", "high", "low",
+    ]
+    assert buckets.index.equals(deciles.index)
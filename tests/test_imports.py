@@ -2,6 +2,8 @@
 
 from importlib import import_module
 
+import pytest
+
 
 MODULES = [
     "src.common.logging",
@@ -18,10 +20,10 @@ MODULES = [
 ]
 
 
-def test_imports_smoke():
+@pytest.mark.parametrize("module_name", MODULES)
+def test_imports_smoke(module_name):
     """
     Light-weight smoke test to ensure core modules import correctly.
     This catches syntax errors and missing dependencies early in CI.
     """
-    for module_name in MODULES:
-        import_module(module_name)
+    import_module(module_name)
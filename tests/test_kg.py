@@ -0,0 +1,29 @@
+# tests/test_kg.py
+
+import pandas as pd
+import pytest
+
+from src.data_gen.generate_nba_uplift import generate_nba_uplift
+from src.kg.build_graph import build_kg_edges
+
+
+def test_polars_edges_match_pandas(tmp_path):
+    """
+    The polars edge build is a drop-in for the pandas one: same rows,
+    same order, same dtypes.
+    """
+    pytest.importorskip("polars")
+
+    cfg = {
+        "seed": 7,
+        "n_personas": 3,
+        "entity_specs": {"action": 4, "service": 3, "category": 2, "sub_category": 2},
+    }
+    uplift_df = generate_nba_uplift(cfg, output_path=tmp_path / "nba.parquet")
+
+    for min_uplift in (0.0, 0.01):
+        expected = build_kg_edges(uplift_df, min_uplift, use_polars=False)
+        actual = build_kg_edges(uplift_df, min_uplift, use_polars=True)
+        pd.testing.assert_frame_equal(
+            actual.reset_index(drop=True), expected.reset_index(drop=True)
+        )
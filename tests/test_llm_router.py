@@ -29,3 +29,111 @@ def test_route_query_smoke(monkeypatch):
         "kg_explore",
         "general_help",
     }
+
+
+def test_response_cache_scoped_semantic_hits():
+    import numpy as np
+    from src.llm.response_cache import SemanticResponseCache
+
+    cache = SemanticResponseCache(threshold=0.95, max_entries=3)
+    q = np.array([1.0, 0.0, 0.0], dtype="float32")
+    near = np.array([0.99, 0.141, 0.0], dtype="float32")
+    far = np.array([0.0, 1.0, 0.0], dtype="float32")
+
+    cache.insert(("member_nba", "1"), q, "answer for member 1")
+
+    assert cache.lookup(("member_nba", "1"), near) == "answer for member 1"
+    assert cache.lookup(("member_nba", "1"), far) is None
+    # Same question for a different member must not hit
+    assert cache.lookup(("member_nba", "2"), q) is None
+
+    # Bounded: filling past max_entries evicts the least recently used scope
+    cache.insert(("kg_explore", None), far, "kg answer")
+    cache.insert(("segment_analysis", None), far, "segment answer")
+    assert cache.lookup(("member_nba", "1"), q) == "answer for member 1"
+    cache.insert(("general_help", None), far, "help answer")
+    assert len(cache) == 3
+    assert cache.lookup(("kg_explore", None), far) is None
+    assert cache.lookup(("member_nba", "1"), q) == "answer for member 1"
+    assert cache.lookup(("general_help", None), far) == "help answer"
+
+
+def test_response_cache_caps_each_scope():
+    import numpy as np
+    from src.llm.response_cache import SemanticResponseCache
+
+    cache = SemanticResponseCache(threshold=0.95, max_entries=10, max_entries_per_scope=2)
+    embs = np.eye(3, dtype="float32")
+
+    cache.insert(("kg_explore", None), embs[2], "other scope")
+    for i in range(3):
+        cache.insert(("general_help", None), embs[i], f"a{i}")
+
+    # Only the scope's oldest answer is dropped; other scopes are untouched
+    assert len(cache) == 3
+    assert cache.lookup(("general_help", None), embs[0]) is None
+    assert cache.lookup(("general_help", None), embs[1]) == "a1"
+    assert cache.lookup(("general_help", None), embs[2]) == "a2"
+    assert cache.lookup(("kg_explore", None), embs[2]) == "other scope"
+
+
+def test_response_cache_keeps_segments_apart():
+    import numpy as np
+    from src.llm.response_cache import SemanticResponseCache
+
+    cache = SemanticResponseCache(threshold=0.95)
+    # Worst case: the two questions embed identically
+    emb = np.array([1.0, 0.0, 0.0], dtype="float32")
+
+    for query, answer in [
+        ("Why do persona 3 members renew?", "persona 3 answer"),
+        ("Why do 0-3m members churn?", "0-3m answer"),
+    ]:
+        scope = router_module._cache_scope("why_explanation", query, None)
+        cache.insert(scope, emb, answer)
+
+    def lookup(query):
+        scope = router_module._cache_scope("why_explanation", query, None)
+        return cache.lookup(scope, emb)
+
+    assert lookup("Why do persona 4 members renew?") is None
+    assert lookup("Why do 3y+ members churn?") is None
+    # A real paraphrase for the same segment still hits
+    assert lookup("why are PERSONA 3 members renewing") == "persona 3 answer"
+
+
+def test_response_cache_sync_version_drops_stale_answers():
+    import numpy as np
+    from src.llm.response_cache import SemanticResponseCache
+
+    cache = SemanticResponseCache(threshold=0.95)
+    emb = np.array([1.0, 0.0, 0.0], dtype="float32")
+
+    cache.sync_version((1, 1, 1))
+    cache.insert(("kg_explore", None, ()), emb, "old build answer")
+    cache.sync_version((1, 1, 1))
+    assert cache.lookup(("kg_explore", None, ()), emb) == "old build answer"
+
+    # Rebuilt recos / index: nothing from the old build is served
+    cache.sync_version((2, 1, 1))
+    assert len(cache) == 0
+    assert cache.lookup(("kg_explore", None, ()), emb) is None
+
+
+def test_response_cache_skipped_when_retrieval_disabled(monkeypatch):
+    fake_client = MagicMock()
+    fake_client.chat.return_value = "stubbed answer"
+    fake_store = MagicMock()
+    monkeypatch.setattr(router_module, "_get_llm_client", lambda _root: fake_client)
+    monkeypatch.setattr(router_module, "_get_vector_store", fake_store)
+    monkeypatch.setenv("RI_DISABLE_RETRIEVAL", "1")
+
+    project_root = Path(__file__).resolve().parents[1]
+    result = router_module.answer_query(
+        user_query="How are personas and categories connected?",
+        project_root=project_root,
+    )
+
+    assert result["answer"] == "stubbed answer"
+    # Neither the cache nor retrieval touched the store / embedding model
+    fake_store.assert_not_called()